@@ -1,11 +1,36 @@
-import streamlit as st
+import math
+import time
+from datetime import UTC, datetime
+
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import yfinance as yf
-import requests
-import pdfplumber
-import io
+import streamlit as st
+
+from resilience import figures, loader
+from resilience.allocation import DepositAllocator
+from resilience.data import PDF_URL, TICKER_MAP
+from resilience.engine import ResilienceEngine
+from resilience.history import (
+    HistoryStore,
+    cushion_yoy,
+    history_names,
+    stress_delta_trend,
+)
+from resilience.market import MarketDataClient
+from resilience.metrics import ASSET_TIERS, REGULATORY_MIN
+from resilience.monitor import LimitMonitor, parse_rules
+from resilience.prices import PriceHistoryStore, risk_overlay, update_histories
+from resilience.refresh import FALLBACK, FRESH, STALE, BackgroundRefresher, Snapshot
+from resilience.resolver import TickerResolver
+from resilience.shared import open_store, single_flight
+from resilience.simulation import simulate_cushions
+from resilience.store import StressTableStore
+from resilience.streaming import (
+    LiveValuation,
+    PriceStream,
+    SimulatedFeed,
+    YahooPriceSource,
+)
+from resilience.telemetry import TRACER
 
 # ──────────────────────────────────────────
 # PAGE CONFIG
@@ -102,94 +127,208 @@ def insight_card(title, body):
     st.markdown(f'<div class="insight-card"><h4>{title}</h4><p>{body}</p></div>', unsafe_allow_html=True)
 
 
+def tidy(frame, decimals=2):
+    """Widen float32 columns and round them, so tables show 9.1 rather than 9.1000004."""
+    return frame.astype({c: "float64" for c in frame.select_dtypes("float32").columns}).round(decimals)
+
+
+def traced_chart(stage, key, build_spec, rows=None):
+    """Fetch or patch the session's cached figure for ``key`` and send it, inside one timed span."""
+    cache = st.session_state.setdefault("figure_cache", figures.FigureCache())
+    with TRACER.span(f"figure.{stage}", rows=rows) as span:
+        fig, span["cache"] = cache.get(stage, key, build_spec)
+        st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+
+STREAM_RERUN_S = 2
+
+
+@st.fragment(run_every=STREAM_RERUN_S)
+def live_valuation_chart(valuation, stream, key):
+    """Valuation matrix repriced from ``stream``; reruns on its own and moves only the changed points."""
+    state = st.session_state.get("live_valuation")
+    if state is None or state[0] != key:
+        state = (key, LiveValuation(valuation, stream), figures.valuation_matrix(valuation))
+        st.session_state["live_valuation"] = state
+    _, live, fig = state
+    with TRACER.span("figure.valuation_live", rows=len(valuation.frame)) as span:
+        update = live.apply(stream)
+        monitor = st.session_state.get("limit_monitor")
+        if monitor is not None and len(update.rows):
+            monitor[1].update(live.frame(valuation)[["Bank", "Price_to_Book"]].iloc[update.rows])
+        figures.patch_valuation_points(fig, live, update)
+        span["cache"] = "patch" if len(update.rows) else "hit"
+        span["rows"] = len(update.rows)
+        st.plotly_chart(fig, use_container_width=True, key="valuation_live")
+    note = f" · feed error: {stream.error}" if stream.error else ""
+    st.caption(
+        f"Streaming prices · {len(update.rows)} banks repriced in the last {STREAM_RERUN_S}s · "
+        f"median P/B {update.median_pb:.2f}{note}"
+    )
+
+
 # ──────────────────────────────────────────
 # DATA
 # ──────────────────────────────────────────
-FALLBACK_DATA = [
-    {"Bank": "JPMorgan Chase", "Actual_CET1": 15.0, "Min_Stressed_CET1": 12.5, "Total_Assets_B": 3395},
-    {"Bank": "Bank of America", "Actual_CET1": 11.8, "Min_Stressed_CET1": 9.1, "Total_Assets_B": 2540},
-    {"Bank": "Citigroup", "Actual_CET1": 13.4, "Min_Stressed_CET1": 9.7, "Total_Assets_B": 1700},
-    {"Bank": "Wells Fargo", "Actual_CET1": 11.4, "Min_Stressed_CET1": 8.1, "Total_Assets_B": 1727},
-    {"Bank": "Goldman Sachs", "Actual_CET1": 14.4, "Min_Stressed_CET1": 8.5, "Total_Assets_B": 1600},
-    {"Bank": "Morgan Stanley", "Actual_CET1": 15.2, "Min_Stressed_CET1": 9.8, "Total_Assets_B": 1180},
-    {"Bank": "Capital One", "Actual_CET1": 12.9, "Min_Stressed_CET1": 7.7, "Total_Assets_B": 475},
-    {"Bank": "U.S. Bancorp", "Actual_CET1": 9.9, "Min_Stressed_CET1": 6.8, "Total_Assets_B": 663},
-    {"Bank": "PNC", "Actual_CET1": 9.8, "Min_Stressed_CET1": 7.1, "Total_Assets_B": 560},
-    {"Bank": "Truist", "Actual_CET1": 10.1, "Min_Stressed_CET1": 6.2, "Total_Assets_B": 535},
-]
-
-PDF_URL = "https://www.federalreserve.gov/publications/files/2025-dfast-results-20250627.pdf"
-
-TICKER_MAP = {
-    "JPMorgan Chase": "JPM", "Bank of America": "BAC", "Citigroup": "C",
-    "Wells Fargo": "WFC", "Goldman Sachs": "GS", "Morgan Stanley": "MS",
-    "Capital One": "COF", "U.S. Bancorp": "USB", "PNC": "PNC",
-    "Truist": "TFC", "Charles Schwab": "SCHW", "American Express": "AXP",
-    "State Street": "STT", "BNY Mellon": "BK",
-}
+STRESS_REFRESH_S = 3600
+MARKET_REFRESH_S = 3600
+PRICE_REFRESH_S = 6 * 3600
+# 500k scenarios × 30 banks take about 0.8s; 1M (about 1.6s) is left to scripts.
+MC_SCENARIO_OPTIONS = [10_000, 50_000, 100_000, 250_000, 500_000]
+MARKET_UNIVERSE = sorted(set(TICKER_MAP.values()))
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def resilience_engine(version, _frame):
+    """One memoizing engine per data version, shared by every session."""
+    return ResilienceEngine(_frame, version)
+
+
+@st.cache_resource(show_spinner=False)
+def ticker_resolver():
+    """Name → ticker index, compiled once per server process."""
+    return TickerResolver(TICKER_MAP)
+
+
+@st.cache_resource(show_spinner=False)
+def market_client():
+    """One fetcher per server process; its per-ticker cache outlives any bank selection."""
+    return MarketDataClient()
+
+
+@st.cache_resource(show_spinner=False)
+def shared_store():
+    """Host-wide store so replicas share one PDF parse and one Yahoo sweep."""
+    return open_store()
+
+
+@st.cache_resource(show_spinner=False)
+def data_refresher():
+    """Background refresher for the stress table, started once per server process."""
+    refresher = BackgroundRefresher()
+    store = shared_store()
+    initial = loader.load_cached_stress_data()
+    as_of = StressTableStore().meta(PDF_URL).get("checked_at", time.time())
+    if initial is None:
+        initial, as_of = loader.fallback_stress_data(), time.time()
+    refresher.register(
+        "stress",
+        lambda: single_flight(store, f"stress:{PDF_URL}", loader.load_stress_data, STRESS_REFRESH_S * 0.8,
+                              accept=lambda data: data.source != FALLBACK),
+        STRESS_REFRESH_S,
+        initial=Snapshot(initial, as_of, initial.source, None),
+        source_of=lambda data: data.source,
+    )
+    return refresher.start()
 
 
-@st.cache_data(ttl=3600, show_spinner=False)
-def load_stress_data():
-    """Try PDF first, fall back to embedded data."""
-    try:
-        resp = requests.get(PDF_URL, timeout=15)
-        if resp.status_code == 200:
-            pdf_file = io.BytesIO(resp.content)
-            with pdfplumber.open(pdf_file) as pdf:
-                for page in pdf.pages:
-                    text = page.extract_text() or ""
-                    if "Projected minimum common equity tier 1 capital ratio" in text and "Severely Adverse" in text:
-                        tables = page.extract_tables()
-                        for table in tables:
-                            raw = pd.DataFrame(table)
-                            if raw.shape[1] > 2 and raw.shape[0] > 10:
-                                cleaned = pd.DataFrame()
-                                raw = raw.dropna(how="all")
-                                cleaned["Bank"] = raw.iloc[:, 0]
-                                cleaned["Actual_CET1"] = pd.to_numeric(raw.iloc[:, 1], errors="coerce")
-                                cleaned["Min_Stressed_CET1"] = pd.to_numeric(raw.iloc[:, -1], errors="coerce")
-                                cleaned = cleaned.dropna()
-                                cleaned = cleaned[cleaned["Bank"].str.len() > 3]
-                                cleaned["Total_Assets_B"] = 500
-                                if not cleaned.empty:
-                                    return cleaned
-    except Exception:
-        pass
-    return pd.DataFrame(FALLBACK_DATA)
-
-
-@st.cache_data(ttl=3600, show_spinner=False)
 def fetch_market_data(banks):
-    """Fetch Price-to-Book and Dividend Yield from Yahoo Finance."""
-    rows = []
-    for bank in banks:
-        ticker = None
-        for name, sym in TICKER_MAP.items():
-            if name in bank:
-                ticker = sym
-                break
-        if not ticker:
-            continue
-        try:
-            info = yf.Ticker(ticker).info
-            p_b = info.get("priceToBook", None)
-            div = (info.get("dividendYield", 0) or 0) * 100
-            rows.append({"Bank": bank, "Ticker": ticker, "Price_to_Book": p_b, "Div_Yield": div})
-        except Exception:
-            rows.append({"Bank": bank, "Ticker": ticker, "Price_to_Book": None, "Div_Yield": None})
-    return pd.DataFrame(rows)
+    """Price-to-Book and Dividend Yield from the last background Yahoo sweep, or ``None``."""
+    refresher, client, store = data_refresher(), market_client(), shared_store()
+    refresher.register(
+        "market",
+        lambda: single_flight(store, "market:quotes", lambda: client.quotes(MARKET_UNIVERSE, refresh=True),
+                              MARKET_REFRESH_S * 0.8, accept=lambda quotes: any(quotes.values())),
+        MARKET_REFRESH_S,
+        source_of=lambda quotes: "live" if any(quotes.values()) else FALLBACK,
+    )
+    snapshot = refresher.get("market")
+    if snapshot is None or snapshot.source == FALLBACK:
+        return None
+    return loader.load_market_data(banks, ticker_resolver(), quotes=snapshot.value)
+
+
+@st.cache_resource(show_spinner=False)
+def price_store():
+    """The per-ticker daily close cache behind the Market vs Fed section."""
+    return PriceHistoryStore()
+
+
+def refresh_price_histories():
+    """Keep the daily price cache topped up in the background (only the missing days are fetched)."""
+    refresher, store, prices = data_refresher(), shared_store(), price_store()
+    refresher.register(
+        "prices",
+        lambda: single_flight(store, "prices:history", lambda: update_histories(MARKET_UNIVERSE, prices),
+                              PRICE_REFRESH_S * 0.8, accept=lambda result: not result[1]),
+        PRICE_REFRESH_S,
+        source_of=lambda result: FALLBACK if result[1] and not any(result[0].values()) else "live",
+    )
 
 
-# ── Load & compute ──
-with st.spinner("Loading stress-test data..."):
-    df = load_stress_data()
+@st.cache_data(show_spinner=False, max_entries=4)
+def market_risk(version):
+    """Volatility, drawdown and peer correlation for the cached histories at store ``version``."""
+    return risk_overlay(price_store().closes(MARKET_UNIVERSE))
+
+
+def freshness_caption(name, label):
+    """'data as of' line with a freshness indicator for a refreshed dataset."""
+    refresher = data_refresher()
+    state = refresher.freshness(name)
+    snapshot = refresher.get(name)
+    if snapshot is None:
+        return f"{label}: ⏳ loading in background"
+    as_of = datetime.fromtimestamp(snapshot.as_of, UTC).strftime("%Y-%m-%d %H:%M UTC")
+    badge = {FRESH: "🟢 fresh", STALE: "🟡 stale — refresh pending", FALLBACK: "🔴 embedded fallback"}[state]
+    return f"{label} as of {as_of} · {badge}"
+
+
+@st.cache_data(show_spinner=False)
+def approx_market_data(banks):
+    """Approximate P/B from the embedded table, used when live data is off."""
+    return loader.approx_market_data(banks, ticker_resolver())
+
+
+@st.cache_resource(show_spinner=False, max_entries=4, on_release=lambda stream: stream.stop())
+def price_stream(feed, tickers):
+    """One price feed per process for ``tickers``, shared by every session."""
+    source = SimulatedFeed() if feed == "Simulated" else YahooPriceSource()
+    return PriceStream(source, tickers).start()
+
+
+@st.cache_data(show_spinner=False)
+def unmatched_banks(banks):
+    """Bank names the resolver could not map to a ticker."""
+    return ticker_resolver().resolve(list(banks)).unmatched
 
-df["Stress_Delta"] = df["Actual_CET1"] - df["Min_Stressed_CET1"]
-df["Capital_Cushion"] = df["Min_Stressed_CET1"] - 4.5
-df["Layer_Regulatory_Min"] = 4.5
-df["Layer_Stress_Burn"] = df["Actual_CET1"] - df["Min_Stressed_CET1"]
-df["Layer_True_Excess"] = df["Min_Stressed_CET1"] - 4.5
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def stress_tables(version):
+    """Loss rates and PPNR from the same PDF parse as stress data ``version``, read from disk."""
+    tables = loader.load_stress_tables(PDF_URL, StressTableStore())
+    return tables["loss_rates"], tables["ppnr"]
+
+
+@st.cache_resource(show_spinner=False)
+def deposit_allocator():
+    """Shared solver; keeps its ranking as a warm start between reruns."""
+    return DepositAllocator()
+
+
+@st.cache_resource(show_spinner=False)
+def history_store():
+    """The year-partitioned DFAST history store, read-only from the app."""
+    return HistoryStore()
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def load_history(years):
+    """Stored DFAST years; partitions never change once written, so the year list is the key."""
+    history = history_store().read(years)
+    return stress_delta_trend(history), cushion_yoy(history)
+
+
+@st.cache_data(show_spinner="Simulating stress scenarios...", max_entries=32)
+def run_simulation(_df, version, banks, n_scenarios, burn_vol, cet1_vol, rho, floor):
+    """Monte Carlo cushions for the selected banks, cached on data version and inputs."""
+    return simulate_cushions(_df, n_scenarios, burn_vol, cet1_vol, rho, floor=floor).summary
+
+
+# ── Load & compute ──
+stress = data_refresher().get("stress").value
+engine = resilience_engine(stress.version, stress.frame)
+df = engine.metrics
 
 # ──────────────────────────────────────────
 # SIDEBAR
@@ -204,19 +343,78 @@ with st.sidebar:
     )
     st.markdown("---")
 
-    selected_banks = st.multiselect(
-        "Filter Banks",
-        options=df["Bank"].tolist(),
-        default=df["Bank"].tolist(),
+    st.markdown("**Filter Banks**")
+    tier_filter = st.multiselect("Asset-size tier", options=ASSET_TIERS, default=[], placeholder="All tiers")
+    assets_lo = float(math.floor(df["Total_Assets_B"].min()))
+    assets_hi = float(math.ceil(df["Total_Assets_B"].max()))
+    asset_range = None
+    if assets_lo < assets_hi:
+        asset_range = st.slider("Total assets ($B)", assets_lo, assets_hi, (assets_lo, assets_hi))
+        if asset_range == (assets_lo, assets_hi):
+            asset_range = None
+    pinned_banks = st.multiselect(
+        "Banks", options=df["Bank"].cat.categories.tolist(), default=[],
+        placeholder="All banks matching the filters",
     )
+    selected_banks = engine.select(pinned_banks or None, tier_filter or None, asset_range)
 
+    st.markdown("---")
+    with st.expander("What-If Scenario", expanded=False):
+        grid = engine.whatif()
+        whatif_floor = st.select_slider(
+            "Regulatory floor (%)", options=grid.floors.tolist(), value=REGULATORY_MIN,
+            help="Minimum CET1 the cushion is measured against, e.g. 7.0 for 4.5% plus the conservation buffer.",
+        )
+        whatif_multiplier = st.select_slider(
+            "Stress-loss multiplier", options=grid.multipliers.tolist(), value=1.0,
+            format_func=lambda m: f"{m:g}×", help="Scale the Fed's projected capital burn.",
+        )
     st.markdown("---")
     fetch_live = st.toggle("Fetch Live Market Data", value=False,
                            help="Pull real-time Price-to-Book ratios from Yahoo Finance for the Valuation Matrix.")
+    stream_prices = st.toggle("Stream Prices", value=False,
+                              help="Reprice the Valuation Matrix in place as prices move, without rerunning the page.")
+    if stream_prices:
+        stream_feed = st.radio("Price feed", ["Simulated", "Yahoo Finance"], horizontal=True)
+    st.markdown("---")
+    mc_enabled = st.toggle("Monte Carlo Stress Scenarios", value=False,
+                           help="Perturb each bank's stress burn and starting CET1 across correlated scenarios.")
+    if mc_enabled:
+        mc_scenarios = st.select_slider(
+            "Scenarios", options=MC_SCENARIO_OPTIONS, value=100_000,
+            help="Capped where a rerun stays under about a second for the DFAST universe.",
+        )
+        mc_burn_vol = st.slider("Stress-burn volatility", 0.0, 1.0, 0.25, 0.05,
+                                help="Lognormal volatility of the multiplier on the Fed's projected capital burn.")
+        mc_cet1_vol = st.slider("Starting CET1 volatility (pp)", 0.0, 2.0, 0.5, 0.1)
+        mc_rho = st.slider("Cross-bank correlation", 0.0, 0.95, 0.6, 0.05)
+    st.markdown("---")
+    with st.expander("Counterparty Limits", expanded=False):
+        alloc_cash = st.number_input("Cash to place ($M)", min_value=0.0, value=500.0, step=50.0)
+        alloc_min_cushion = st.slider("Min post-stress cushion (%)", 0.0, 8.0, 2.0, 0.25)
+        alloc_concentration = st.slider("Max share per bank (%)", 5, 100, 25, 5)
+        alloc_cap = st.number_input("Default cap per bank ($M)", min_value=0.0, value=150.0, step=25.0)
     st.markdown("---")
     st.caption("Data: Federal Reserve 2025 DFAST  \nMarket: Yahoo Finance")
-
-df_display = df[df["Bank"].isin(selected_banks)].copy()
+    st.caption(freshness_caption("stress", "Stress data"))
+    if fetch_live:
+        st.caption(freshness_caption("market", "Market data"))
+
+if not selected_banks:
+    st.warning("No banks match the current filters.")
+    st.stop()
+
+# Slider moves select a precomputed grid point; the metrics are sliced from it, not recomputed.
+fed_engine = engine
+engine = fed_engine.scenario(whatif_floor, whatif_multiplier)
+df = engine.metrics
+floor = engine.floor
+df_display = engine.view(selected_banks)
+selection_key = (engine.version, frozenset(selected_banks))
+
+if mc_enabled:
+    mc = run_simulation(df_display, engine.version, tuple(df_display["Bank"]),
+                        mc_scenarios, mc_burn_vol, mc_cet1_vol, mc_rho, floor)
 
 # ══════════════════════════════════════════
 # HERO
@@ -273,10 +471,10 @@ with col_solve:
 # ──────────────────────────────────────────
 st.markdown("")
 k1, k2, k3, k4 = st.columns(4)
-safest = df_display.loc[df_display["Capital_Cushion"].idxmax()]
-riskiest = df_display.loc[df_display["Capital_Cushion"].idxmin()]
-k1.metric("Banks Analysed", len(df_display))
-k2.metric("Avg Stress Delta", f"{df_display['Stress_Delta'].mean():.2f}%")
+kpi = engine.summary(selected_banks)
+safest, riskiest = kpi["safest"], kpi["riskiest"]
+k1.metric("Banks Analysed", kpi["count"])
+k2.metric("Avg Stress Delta", f"{kpi['avg_stress_delta']:.2f}%")
 k3.metric("Safest Bank", safest["Bank"], f"+{safest['Capital_Cushion']:.1f}% cushion")
 k4.metric("Most Vulnerable", riskiest["Bank"], f"+{riskiest['Capital_Cushion']:.1f}% cushion")
 
@@ -287,52 +485,94 @@ section("Resilience Metric (Stress Delta)", "How much capital each bank burns in
 
 st.markdown(
     "> **Stress Delta** = Actual CET1 − Min Stressed CET1 &nbsp;|&nbsp; "
-    "**Capital Cushion** = Min Stressed CET1 − 4.5% (regulatory minimum)"
+    f"**Capital Cushion** = Min Stressed CET1 − {floor:g}% (regulatory minimum)"
 )
+if engine.floor != REGULATORY_MIN or whatif_multiplier != 1.0:
+    st.caption(
+        f"What-if scenario: floor {floor:g}%, losses {whatif_multiplier:g}× the Fed's projection. "
+        "Reset both sliders in the sidebar to return to the published results."
+    )
 
 col_table, col_chart = st.columns([2, 3])
 
+SCORECARD_SORTS = {
+    "Stress Delta": "Stress_Delta", "Capital Cushion": "Capital_Cushion", "Actual CET1": "Actual_CET1",
+    "Min Stressed CET1": "Min_Stressed_CET1", "Bank": "Bank",
+}
+
 with col_table:
-    show_df = (
-        df_display[["Bank", "Actual_CET1", "Min_Stressed_CET1", "Stress_Delta", "Capital_Cushion"]]
-        .sort_values("Stress_Delta", ascending=False)
-        .reset_index(drop=True)
-    )
-    show_df.columns = ["Bank", "Actual CET1 %", "Min Stressed CET1 %", "Stress Delta %", "Capital Cushion %"]
+    c_sort, c_order, c_rows = st.columns([3, 2, 2])
+    sort_label = c_sort.selectbox("Sort by", list(SCORECARD_SORTS))
+    ascending = c_order.selectbox("Order", ["Descending", "Ascending"]) == "Ascending"
+    page_size = c_rows.selectbox("Rows", [25, 50, 100, 250], index=1)
+    n_pages = max(1, math.ceil(len(selected_banks) / page_size))
+    page = st.number_input("Page", min_value=1, max_value=n_pages, value=1) - 1 if n_pages > 1 else 0
+    page_df, total_rows = engine.scorecard_page(selected_banks, SCORECARD_SORTS[sort_label], ascending, page, page_size)
+    show_df = tidy(page_df).set_axis(["Bank", "Actual CET1 %", "Min Stressed CET1 %", "Stress Delta %", "Capital Cushion %"], axis=1)
     st.dataframe(show_df, use_container_width=True, hide_index=True, height=400)
+    st.caption(f"Rows {page * page_size + 1:,}–{page * page_size + len(page_df):,} of {total_rows:,}")
 
 with col_chart:
-    fig_res = px.scatter(
-        df_display,
-        x="Stress_Delta",
-        y="Min_Stressed_CET1",
-        size="Total_Assets_B",
-        color="Min_Stressed_CET1",
-        color_continuous_scale="RdYlGn",
-        text="Bank",
-        hover_data={"Actual_CET1": ":.1f", "Capital_Cushion": ":.1f"},
-        labels={
-            "Stress_Delta": "Stress Delta (Capital Burned in Crisis %)",
-            "Min_Stressed_CET1": "Min Stressed CET1 (%)",
-        },
+    fig_res = traced_chart(
+        "resilience_map",
+        (selection_key, (mc_scenarios, mc_burn_vol, mc_cet1_vol, mc_rho) if mc_enabled else None),
+        lambda: figures.resilience_map_spec(df_display, kpi["median_stress_delta"], mc if mc_enabled else None,
+                                            floor),
+        rows=len(df_display),
+    )
+
+if mc_enabled:
+    section(
+        "Monte Carlo Stress Scenarios",
+        f"{mc_scenarios:,} correlated scenarios around the Fed's projection — "
+        "error bars on the map show the 5th–95th percentile of Min Stressed CET1",
     )
-    fig_res.update_traces(textposition="top center", textfont_size=11)
-    fig_res.add_hline(y=4.5, line_dash="dash", line_color="red", annotation_text="Regulatory Death Line (4.5%)")
-    fig_res.add_vline(
-        x=df_display["Stress_Delta"].median(),
-        line_dash="dot", line_color="gray",
-        annotation_text="Median Stress Loss",
+    mc_df = mc.assign(Breach_Prob=mc["Breach_Prob"] * 100).set_axis(
+        ["Bank", f"P(Breach {floor:g}%) %", "Mean Cushion %", "Cushion P5 %", "Cushion P50 %", "Cushion P95 %"],
+        axis=1,
     )
-    fig_res.update_layout(
-        title="Bank Resilience Map — 2025 Stress Test",
-        xaxis_title="← More Resilient  |  Stress Delta (%)  |  Less Resilient →",
-        yaxis_title="Min Stressed CET1 Ratio (%)",
-        template="plotly_dark",
-        height=440,
-        coloraxis_colorbar_title="Min CET1 %",
-        margin=dict(t=60, b=60),
+    st.dataframe(
+        mc_df.sort_values(f"P(Breach {floor:g}%) %", ascending=False).round(2),
+        use_container_width=True, hide_index=True,
     )
-    st.plotly_chart(fig_res, use_container_width=True)
+
+# ── Market view of risk ──
+if fetch_live:
+    refresh_price_histories()
+overlay = market_risk(price_store().version())
+section("Market vs Fed", "Realized volatility, drawdown and peer correlation over the last year, next to Stress Delta")
+if overlay.empty:
+    st.info(
+        "No price history cached yet. Turn on **Fetch Live Market Data** to download daily closes; "
+        "later refreshes only fetch the days that are missing."
+    )
+else:
+    tickers = ticker_resolver().resolve(df_display["Bank"].tolist()).tickers.to_numpy()
+    market_fed = (
+        df_display[["Bank", "Stress_Delta"]].assign(Ticker=tickers)
+        .merge(overlay, on="Ticker", how="inner")
+    )
+    if market_fed.empty:
+        st.caption("None of the selected banks have a cached price history.")
+    else:
+        col_mf_table, col_mf_chart = st.columns([2, 3])
+        with col_mf_table:
+            st.dataframe(
+                tidy(market_fed[["Bank", "Stress_Delta", "Volatility_Ann", "Max_Drawdown", "Peer_Corr"]])
+                .set_axis(["Bank", "Stress Delta %", "Volatility %", "Max Drawdown %", "Peer Corr"], axis=1),
+                use_container_width=True, hide_index=True,
+            )
+            agreement = market_fed["Stress_Delta"].rank().corr(market_fed["Volatility_Ann"].rank())
+            st.caption(
+                f"Rank correlation of Stress Delta with volatility: {agreement:+.2f} "
+                f"(+1 = the market ranks risk exactly as the Fed does). "
+                f"Prices as of {market_fed['As_Of'].max():%Y-%m-%d}."
+            )
+        with col_mf_chart:
+            traced_chart(
+                "market_vs_fed", (selection_key, price_store().version()),
+                lambda: figures.market_vs_fed_spec(market_fed), rows=len(market_fed),
+            )
 
 # ── Review insight cards ──
 section("Review — Reading the Resilience Map")
@@ -372,7 +612,7 @@ with exp_layers:
     lc1, lc2, lc3 = st.columns(3)
     with lc1:
         insight_card(
-            "Regulatory Minimum (4.5%)",
+            f"Regulatory Minimum ({floor:g}%)",
             "The &ldquo;Death Line.&rdquo; If a bank touches this, the bank fails."
         )
     with lc2:
@@ -386,37 +626,12 @@ with exp_layers:
             "The only money actually available for dividends, buybacks, or growth."
         )
 
-df_sorted = df_display.sort_values("Actual_CET1", ascending=True)
-
-fig_cake = go.Figure()
-fig_cake.add_trace(go.Bar(
-    y=df_sorted["Bank"], x=df_sorted["Layer_Regulatory_Min"],
-    name="Regulatory Death Line (4.5%)", orientation="h",
-    marker_color="#ef4444",
-))
-fig_cake.add_trace(go.Bar(
-    y=df_sorted["Bank"], x=df_sorted["Layer_Stress_Burn"],
-    name="Capital Burned in Crisis", orientation="h",
-    marker_color="#facc15", marker_pattern_shape="/",
-))
-fig_cake.add_trace(go.Bar(
-    y=df_sorted["Bank"], x=df_sorted["Layer_True_Excess"],
-    name="True Excess Capacity (Safety Margin)", orientation="h",
-    marker_color="#22c55e",
-))
-avg_capital = df_display["Actual_CET1"].mean()
-fig_cake.add_vline(x=avg_capital, line_dash="dash", line_color="white",
-                   annotation_text=f"Avg Capital {avg_capital:.1f}%", annotation_font_color="white")
-fig_cake.update_layout(
-    barmode="stack",
-    title="The Capital Stack: Who Has a Real Safety Margin?",
-    xaxis_title="CET1 Capital Ratio (%)",
-    template="plotly_dark",
-    height=480,
-    legend=dict(orientation="h", yanchor="bottom", y=-0.25, xanchor="center", x=0.5),
-    margin=dict(l=10, t=60, b=80),
+df_sorted = engine.capital_stack(selected_banks)
+
+fig_cake = traced_chart(
+    "capital_stack", selection_key,
+    lambda: figures.capital_stack_spec(df_sorted, kpi["avg_capital"], floor), rows=len(df_sorted),
 )
-st.plotly_chart(fig_cake, use_container_width=True)
 
 # ── How to read ──
 section("Reading the Capital Stack")
@@ -444,6 +659,51 @@ st.info(
     "**small Yellow bar** (Low Risk) and a **large Green bar** (High Safety)."
 )
 
+with st.expander("Loan Loss Rates & Pre-Provision Net Revenue"):
+    loss_rates, ppnr = stress_tables(stress.version)
+    if stress.source == FALLBACK or (loss_rates.empty and ppnr.empty):
+        st.caption("Shown once the DFAST results PDF has been parsed; the embedded fallback table has no breakdown.")
+    else:
+        if not loss_rates.empty:
+            st.markdown("**Projected loan loss rates, severely adverse (%)**")
+            st.dataframe(
+                loss_rates[loss_rates["Bank"].isin(selected_banks)].dropna(axis=1, how="all"),
+                hide_index=True, use_container_width=True,
+            )
+        if not ppnr.empty:
+            st.markdown("**Pre-provision net revenue and pre-tax net income ($B)**")
+            st.dataframe(ppnr[ppnr["Bank"].isin(selected_banks)], hide_index=True, use_container_width=True)
+
+# ══════════════════════════════════════════
+# DEPOSIT ALLOCATION
+# ══════════════════════════════════════════
+section(
+    "Deposit Allocation — Counterparty Risk Limits",
+    f"Placing ${alloc_cash:,.0f}M only with banks that keep a &gt;{alloc_min_cushion:.2f}% cushion after the crash",
+)
+
+col_caps, col_alloc = st.columns([2, 3])
+with col_caps:
+    caps_df = st.data_editor(
+        pd.DataFrame({"Bank": df_display["Bank"].to_numpy(), "Cap ($M)": alloc_cap}),
+        disabled=["Bank"], hide_index=True, use_container_width=True, key="alloc_caps",
+    )
+allocation = deposit_allocator().solve(
+    df_display, alloc_cash, alloc_min_cushion, alloc_concentration / 100, caps_df["Cap ($M)"].to_numpy(),
+)
+with col_alloc:
+    placed = allocation.frame[allocation.frame["Deposit"] > 0].sort_values("Deposit")
+    fig_alloc = traced_chart(
+        "allocation",
+        (selection_key, alloc_cash, alloc_min_cushion, alloc_concentration, tuple(caps_df["Cap ($M)"])),
+        lambda: figures.allocation_bars_spec(placed), rows=len(placed),
+    )
+    if allocation.unallocated > 0:
+        st.warning(
+            f"${allocation.unallocated:,.0f}M could not be placed within these limits — "
+            "raise the caps or concentration limit, or lower the minimum cushion."
+        )
+
 # ══════════════════════════════════════════
 # 3 — VALUATION MATRIX
 # ══════════════════════════════════════════
@@ -457,62 +717,30 @@ st.markdown(
     "> **The Opportunity:** A bank that is **Safe** but **Cheap** = potential investment **Alpha**."
 )
 
-if fetch_live:
-    with st.spinner("Fetching live market data from Yahoo Finance..."):
-        mkt = fetch_market_data(df_display["Bank"].tolist())
-    df_val = df_display.merge(mkt, on="Bank", how="inner").dropna(subset=["Price_to_Book"])
+unmatched = unmatched_banks(tuple(df_display["Bank"]))
+if unmatched:
+    st.caption("No ticker mapping for: " + ", ".join(unmatched))
+
+mkt = fetch_market_data(df_display["Bank"].tolist()) if fetch_live else None
+if mkt is not None:
+    market_version = loader.frame_version(mkt)
+    valuation = engine.valuation(selected_banks, mkt, market_version)
 else:
-    # Approximate P/B fallback so chart always renders
-    pb_approx = {
-        "JPMorgan Chase": 2.05, "Bank of America": 1.15, "Citigroup": 0.65,
-        "Wells Fargo": 1.25, "Goldman Sachs": 1.40, "Morgan Stanley": 1.75,
-        "Capital One": 1.05, "U.S. Bancorp": 1.35, "PNC": 1.50, "Truist": 0.90,
-    }
-    df_val = df_display.copy()
-    df_val["Ticker"] = df_val["Bank"].map({n: t for n, t in TICKER_MAP.items()})
-    df_val["Price_to_Book"] = df_val["Bank"].map(pb_approx)
-    df_val = df_val.dropna(subset=["Price_to_Book"])
+    market_version = "approx"
+    if fetch_live:
+        st.info("Live market data is not available yet (refreshing in the background) — showing approximate P/B.")
+    valuation = engine.valuation(selected_banks, approx_market_data(tuple(df["Bank"])), market_version)
+df_val = valuation.frame
+live_key = (selection_key, market_version, stream_feed) if stream_prices else None
 
 if not df_val.empty:
-    median_safety = df_val["Min_Stressed_CET1"].median()
-    median_pb = df_val["Price_to_Book"].median()
-
-    fig_val = px.scatter(
-        df_val,
-        x="Min_Stressed_CET1",
-        y="Price_to_Book",
-        size="Total_Assets_B",
-        text="Ticker",
-        hover_data={"Bank": True, "Actual_CET1": ":.1f", "Stress_Delta": ":.1f"},
-        labels={
-            "Min_Stressed_CET1": "Safety Score (Min Stressed CET1 %)",
-            "Price_to_Book": "Market Price (Price-to-Book)",
-        },
-    )
-    fig_val.update_traces(
-        textposition="top center", textfont_size=12,
-        marker=dict(color="royalblue", line=dict(width=1, color="white")),
-    )
-    fig_val.add_hline(y=median_pb, line_dash="dash", line_color="gray", opacity=0.5)
-    fig_val.add_vline(x=median_safety, line_dash="dash", line_color="gray", opacity=0.5)
-
-    # Quadrant annotations
-    fig_val.add_annotation(x=df_val["Min_Stressed_CET1"].max(), y=df_val["Price_to_Book"].min(),
-                           text="BARGAINS<br>(Safe & Cheap)", showarrow=False,
-                           font=dict(size=13, color="#22c55e"), xanchor="right", yanchor="bottom")
-    fig_val.add_annotation(x=df_val["Min_Stressed_CET1"].min(), y=df_val["Price_to_Book"].max(),
-                           text="RISKY PREMIUM<br>(Unsafe & Expensive)", showarrow=False,
-                           font=dict(size=13, color="#ef4444"), xanchor="left", yanchor="top")
-
-    fig_val.update_layout(
-        title="Are You Overpaying for Risk?",
-        xaxis_title="← Riskier  |  Safety Score (Min Stressed CET1 %)  |  Safer →",
-        yaxis_title="← Cheaper  |  Price-to-Book  |  Expensive →",
-        template="plotly_dark",
-        height=500,
-        margin=dict(t=60, b=60),
-    )
-    st.plotly_chart(fig_val, use_container_width=True)
+    if stream_prices:
+        live_valuation_chart(valuation, price_stream(stream_feed, tuple(df_val["Ticker"])), live_key)
+    else:
+        fig_val = traced_chart(
+            "valuation_matrix", (selection_key, market_version),
+            lambda: figures.valuation_matrix_spec(valuation), rows=len(df_val),
+        )
 
     # Quadrant guide
     section("How to Read the Valuation Matrix")
@@ -542,6 +770,97 @@ if not df_val.empty:
 else:
     st.warning("No market data available. Enable **Fetch Live Market Data** in the sidebar.")
 
+# ══════════════════════════════════════════
+# LIMIT MONITOR
+# ══════════════════════════════════════════
+section("Counterparty Limit Monitor", "Rules re-checked only where stress or market inputs changed")
+
+DEFAULT_RULES = """limit Cushion floor: Capital_Cushion > 2
+limit Burn vs peers: Stress_Delta < peer_median
+alert P/B drop: pct_change(P/B) <= -15"""
+
+col_rules, col_alerts = st.columns([2, 3])
+with col_rules:
+    rules_text = st.text_area(
+        "Rules", DEFAULT_RULES, height=140,
+        help="One per line: `limit <name>: <expr>` fires when the expression fails, "
+             "`alert <name>: <expr>` when it holds. Thresholds may be numbers, peer_median, "
+             "peer_mean or peer_pNN; pct_change(col) compares with a day earlier.",
+    )
+try:
+    rules = parse_rules(rules_text)
+except ValueError as exc:
+    rules = None
+    col_rules.error(str(exc))
+if rules is not None:
+    monitor_state = st.session_state.get("limit_monitor")
+    if monitor_state is None or monitor_state[0] != rules_text:
+        monitor_state = (rules_text, LimitMonitor(rules))
+        st.session_state["limit_monitor"] = monitor_state
+    monitor = monitor_state[1]
+    # One P/B source: while streaming, the live frame the fragment also feeds; otherwise the static one.
+    live_state = st.session_state.get("live_valuation") if stream_prices else None
+    pb_frame = live_state[1].frame(valuation) if live_state is not None and live_state[0] == live_key else df_val
+    with TRACER.span("monitor.update", rows=len(fed_engine.metrics)) as span:
+        # Limits track the Fed's own scenario, so what-if settings never fire or clear real alerts.
+        # Banks outside the current selection have no P/B here; they keep their last known value.
+        monitor.update(fed_engine.metrics)
+        monitor.update(pb_frame[["Bank", "Price_to_Book"]])
+        passes = list(monitor.evaluations)[-2:]
+        checked = sum(p.cells for p in passes)
+        span["cache"] = "miss" if checked else "hit"
+    changed_inputs = sorted({c for p in passes for c in p.changed_columns})
+    if engine is not fed_engine:
+        col_rules.caption("Limits are checked against the Fed's scenario; the what-if settings do not apply here.")
+    with col_alerts:
+        active = monitor.active()
+        if active.empty:
+            st.success("No limits breached.")
+        else:
+            st.dataframe(tidy(active), hide_index=True, use_container_width=True)
+        st.caption(
+            f"Last pass: {sum(p.rules for p in passes)} rule evaluations, {checked} bank checks "
+            f"({', '.join(changed_inputs) or 'no inputs changed'})"
+        )
+    with st.expander("Alert history"):
+        history = monitor.history()
+        if history.empty:
+            st.caption("No alerts have fired or cleared yet in this session.")
+        else:
+            st.dataframe(history.iloc[::-1].head(500), hide_index=True, use_container_width=True)
+
+# ══════════════════════════════════════════
+# MULTI-YEAR TRENDS
+# ══════════════════════════════════════════
+section("Multi-Year Trends", "How each bank's stress burn and cushion moved across DFAST cycles")
+
+history_years = tuple(history_store().years())
+if not history_years:
+    st.info(
+        "No DFAST history ingested yet. Run `python -m resilience.history` once to parse the "
+        "2018–2025 results; later runs only fetch years that are missing."
+    )
+else:
+    trend, yoy = load_history(history_years)
+    # The store keys banks by canonical name; the working set keeps the names as published.
+    history_sel = history_names(selected_banks, ticker_resolver()).unique()
+    trend_sel = trend.loc[trend.index.intersection(history_sel)]
+    yoy_sel = yoy.loc[yoy.index.intersection(history_sel)]
+    if trend_sel.empty:
+        st.caption("None of the selected banks appear in the stored history.")
+    else:
+        st.caption(f"Years in store: {', '.join(map(str, history_years))}")
+        fig_trend = traced_chart(
+            "stress_trend", (history_years, frozenset(trend_sel.index)),
+            lambda: figures.stress_trend_spec(trend_sel), rows=trend_sel.size,
+        )
+        if not yoy_sel.empty:
+            st.markdown("**Year-over-year change in Capital Cushion (pts)**")
+            st.dataframe(
+                yoy_sel.style.format("{:+.1f}", na_rep="—").background_gradient(cmap="RdYlGn", axis=None),
+                use_container_width=True,
+            )
+
 # ──────────────────────────────────────────
 # FOOTER
 # ──────────────────────────────────────────
@@ -550,3 +869,16 @@ st.caption(
     "Dashboard built from the 2025 Federal Reserve DFAST Stress-Test Results. "
     "Market data provided by Yahoo Finance. For educational purposes only — not investment advice."
 )
+
+# ──────────────────────────────────────────
+# PERFORMANCE PANEL
+# ──────────────────────────────────────────
+with st.sidebar, st.expander("⏱ Performance", expanded=False):
+    perf = TRACER.summary()
+    st.dataframe(
+        perf.round({"p50_ms": 1, "p90_ms": 1, "p99_ms": 1, "last_ms": 1, "hit_ratio": 2}),
+        hide_index=True, use_container_width=True,
+    )
+    st.caption("Wall time per stage across all sessions in this server process.")
+    st.download_button("Prometheus metrics", TRACER.to_prometheus(), "resilience_metrics.prom", "text/plain")
+    st.download_button("JSON-lines trace", TRACER.to_jsonl(), "resilience_trace.jsonl", "application/x-ndjson")
@@ -0,0 +1 @@
+"""Offline benchmark suite for the load, compute and render stages."""
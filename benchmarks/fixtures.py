@@ -0,0 +1,222 @@
+"""Offline fixtures: synthetic bank universes, a DFAST-like PDF and a stub quote server."""
+import http.server
+import json
+import random
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from resilience.pdf_extract import (
+    ASSETS_TITLE,
+    CET1_TITLE,
+    LOSS_RATES_TITLE,
+    PPNR_TITLE,
+)
+
+
+def synthetic_universe(n_banks, seed=0):
+    """A stress table shaped like ``load_stress_data`` output, with ``n_banks`` rows."""
+    rng = np.random.default_rng(seed)
+    actual = rng.uniform(9.0, 16.0, n_banks).round(1)
+    burn = rng.uniform(1.0, 7.0, n_banks).round(1)
+    return pd.DataFrame({
+        "Bank": [f"Synthetic Bank {i:04d}" for i in range(n_banks)],
+        "Actual_CET1": actual,
+        "Min_Stressed_CET1": (actual - burn).round(1),
+        "Total_Assets_B": rng.lognormal(6.0, 1.0, n_banks).round(0),
+    })
+
+
+def synthetic_market(universe, seed=0):
+    """Ticker and Price-to-Book columns for a synthetic universe."""
+    rng = np.random.default_rng(seed + 1)
+    return pd.DataFrame({
+        "Bank": universe["Bank"],
+        "Ticker": [f"SB{i:04d}" for i in range(len(universe))],
+        "Price_to_Book": rng.uniform(0.5, 2.5, len(universe)).round(2),
+    })
+
+
+def _pdf_text(s):
+    return s.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _table_page_ops(title, subtitle, rows):
+    """Content-stream operators for one ruled four-column table page, and its height."""
+    row_h, cols, right = 14, [50, 250, 350, 450], 550
+    height = max(792, 100 + row_h * len(rows))
+    top = height - 72
+    ops = [
+        f"BT /F1 11 Tf 50 {height - 32} Td ({_pdf_text(title)}) Tj ET",
+        f"BT /F1 9 Tf 50 {height - 47} Td ({_pdf_text(subtitle)}) Tj ET",
+    ]
+    for i, row in enumerate(rows):
+        y = top - i * row_h - 10
+        for x, value in zip(cols, row):
+            ops.append(f"BT /F1 9 Tf {x + 2} {y} Td ({_pdf_text(value)}) Tj ET")
+    bottom = top - len(rows) * row_h
+    ops += [f"50 {top - i * row_h} m {right} {top - i * row_h} l S" for i in range(len(rows) + 1)]
+    ops += [f"{x} {top} m {x} {bottom} l S" for x in cols + [right]]
+    return ops, height
+
+
+def _supplementary_tables(universe, seed=0):
+    """Total-assets, loss-rate and PPNR tables in the results PDF's layout, keyed by title."""
+    rng = np.random.default_rng(seed + 2)
+    n = len(universe)
+    banks = universe["Bank"].tolist()
+    assets = universe["Total_Assets_B"].to_numpy(dtype=float)
+    loss = rng.uniform(1.0, 12.0, (n, 3))
+    ppnr = assets * rng.uniform(0.01, 0.04, n)
+    provisions = assets * rng.uniform(0.01, 0.05, n)
+    return {
+        ASSETS_TITLE + " of participating banks (billions of dollars)": (
+            "As of 2024:Q4",
+            [["Bank", "Total assets", "Risk-weighted assets", "Tier 1 leverage"]]
+            + [[b, f"{a:,.0f}", f"{a * 0.6:,.0f}", "7.0"] for b, a in zip(banks, assets)],
+        ),
+        LOSS_RATES_TITLE + ", by bank (percent)": (
+            "Severely Adverse scenario",
+            [["Bank", "Total loans", "Credit cards", "Commercial real estate"]]
+            + [[b, *(f"{v:.1f}" for v in row)] for b, row in zip(banks, loss)],
+        ),
+        PPNR_TITLE + " (billions of dollars)": (
+            "Severely Adverse scenario",
+            [["Bank", "Pre-provision", "Provisions", "Net income"], ["", "net revenue", "", "before taxes"]]
+            + [[b, f"{p:.1f}", f"{q:.1f}", f"{p - q:.1f}"] for b, p, q in zip(banks, ppnr, provisions)],
+        ),
+    }
+
+
+def dfast_like_pdf(universe, n_pages=120, table_page=80, outline=True, supplementary=True):
+    """Bytes of a results-style PDF: filler pages plus ruled results tables.
+
+    The CET1 table page carries the real title and scenario phrases, and an
+    outline entry points at it when ``outline`` is true, so both the outline
+    and the text-index paths of the page locator can be exercised. With
+    ``supplementary``, the total-assets, loss-rate and PPNR tables follow it
+    on every second page.
+    """
+    rows = [["Bank", "Actual 2024:Q4", "Ending", "Minimum"]]
+    for bank, actual, stressed in universe[["Bank", "Actual_CET1", "Min_Stressed_CET1"]].itertuples(index=False):
+        rows.append([bank, f"{actual:.1f}", f"{(actual + stressed) / 2:.1f}", f"{stressed:.1f}"])
+    tables = {table_page: ("Table 4. " + CET1_TITLE, "Severely Adverse scenario", rows)}
+    if supplementary:
+        for k, (title, (subtitle, extra)) in enumerate(_supplementary_tables(universe).items(), 1):
+            tables[(table_page + 2 * k) % n_pages] = (f"Table {4 + k}. {title}", subtitle, extra)
+
+    contents, heights = [], []
+    for p in range(n_pages):
+        if p in tables:
+            ops, height = _table_page_ops(*tables[p])
+        else:
+            height = 792
+            ops = [f"BT /F1 11 Tf 50 760 Td (Section {p}: severely adverse scenario results) Tj ET"]
+            ops += [
+                f"BT /F1 9 Tf 50 {730 - k * 16} Td (Projected losses, revenue and capital, page {p} line {k}) Tj ET"
+                for k in range(40)
+            ]
+        contents.append("\n".join(ops).encode("latin-1"))
+        heights.append(height)
+
+    objs = [b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>", None]
+    font_id, pages_id = 1, 2
+    kids = []
+    for content, height in zip(contents, heights):
+        objs.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        objs.append((
+            f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 612 {height}] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {len(objs)} 0 R >>"
+        ).encode())
+        kids.append(len(objs))
+    objs[pages_id - 1] = (
+        f"<< /Type /Pages /Kids [{' '.join(f'{k} 0 R' for k in kids)}] /Count {len(kids)} >>"
+    ).encode()
+    catalog = f"<< /Type /Catalog /Pages {pages_id} 0 R"
+    if outline:
+        outlines_id, item_id = len(objs) + 1, len(objs) + 2
+        objs.append(f"<< /Type /Outlines /First {item_id} 0 R /Last {item_id} 0 R /Count 1 >>".encode())
+        objs.append((
+            f"<< /Title ({_pdf_text(CET1_TITLE)}) /Parent {outlines_id} 0 R "
+            f"/Dest [{kids[table_page]} 0 R /Fit] >>"
+        ).encode())
+        catalog += f" /Outlines {outlines_id} 0 R"
+    objs.append((catalog + " >>").encode())
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objs, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, len(objs), xref)
+    return bytes(out)
+
+
+class StubQuoteServer:
+    """Local HTTP server standing in for Yahoo's quote endpoint.
+
+    ``GET /v7/finance/quote?symbols=T`` answers after ``latency`` seconds with a
+    Yahoo-shaped JSON body, or with HTTP 429 for a fraction ``error_rate`` of
+    requests.
+    """
+
+    def __init__(self, latency=0.02, error_rate=0.0, seed=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        rng = random.Random(seed)
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                server.requests += 1
+                time.sleep(server.latency)
+                if rng.random() < server.error_rate:
+                    body, status = b'{"finance": {"error": "Too Many Requests"}}', 429
+                else:
+                    symbol = parse_qs(urlparse(self.path).query).get("symbols", [""])[0]
+                    result = {"symbol": symbol, "priceToBook": round(rng.uniform(0.5, 2.5), 2),
+                              "dividendYield": round(rng.uniform(0.0, 0.05), 4)}
+                    body, status = json.dumps({"quoteResponse": {"result": [result]}}).encode(), 200
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        class Server(http.server.ThreadingHTTPServer):
+            daemon_threads = True
+            request_queue_size = 256  # the default backlog of 5 drops SYNs under a wide thread pool
+
+        self._httpd = Server(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._httpd.server_port}"
+
+    def __enter__(self):
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def fetch_quote(self, ticker, session):
+        """``MarketDataClient`` quote function that talks to this server."""
+        resp = session.get(f"{self.url}/v7/finance/quote", params={"symbols": ticker}, timeout=10)
+        resp.raise_for_status()
+        info = resp.json()["quoteResponse"]["result"][0]
+        return {
+            "Price_to_Book": info.get("priceToBook", None),
+            "Div_Yield": (info.get("dividendYield", 0) or 0) * 100,
+        }
@@ -0,0 +1,201 @@
+"""Run the offline benchmark suite and write machine-readable results.
+
+Usage::
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --output new.json --baseline bench.json
+
+Stages cover PDF table extraction (synthetic DFAST-like PDF), the market-data
+fetch (local stub server with configurable latency and errors), the derived
+metric computation and building + serializing the three dashboard figures,
+each over universes of 10, 100 and 1,000 banks by default. No network access
+is needed.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import UTC, datetime
+
+import requests
+
+from benchmarks.fixtures import (
+    StubQuoteServer,
+    dfast_like_pdf,
+    synthetic_market,
+    synthetic_universe,
+)
+from resilience import figures
+from resilience.engine import ResilienceEngine
+from resilience.market import MarketDataClient
+from resilience.pdf_extract import CET1_TITLE, SCENARIO, locate_pages, parse_stress_pdf
+
+
+def _time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _result(stage, n_banks, samples, **extra):
+    return {
+        "stage": stage,
+        "n_banks": n_banks,
+        "repeat": len(samples),
+        "min_s": min(samples),
+        "median_s": statistics.median(samples),
+        "mean_s": statistics.fmean(samples),
+        **extra,
+    }
+
+
+def bench_pdf(n_banks, repeat):
+    pdf = dfast_like_pdf(synthetic_universe(n_banks))
+    parsed = parse_stress_pdf(pdf)
+    rows = 0 if parsed is None else len(parsed)
+    return [
+        _result("pdf_locate", n_banks, _time(lambda: locate_pages(pdf, CET1_TITLE, SCENARIO), repeat)),
+        _result("pdf_extract", n_banks, _time(lambda: parse_stress_pdf(pdf), repeat),
+                rows=rows, pdf_bytes=len(pdf)),
+    ]
+
+
+def bench_market(n_banks, repeat, latency, error_rate, workers):
+    tickers = synthetic_market(synthetic_universe(n_banks))["Ticker"].tolist()
+    with StubQuoteServer(latency=latency, error_rate=error_rate) as stub:
+        def client():
+            return MarketDataClient(stub.fetch_quote, requests.Session, max_workers=workers,
+                                    backoff=0.01, deadline=600.0, breaker_threshold=10)
+        cold = _time(lambda: client().quotes(tickers), repeat)
+        warm_client = client()
+        warm_client.quotes(tickers)
+        warm = _time(lambda: warm_client.quotes(tickers), repeat)
+        return [
+            _result("market_fetch_cold", n_banks, cold, latency_s=latency, error_rate=error_rate, workers=workers),
+            _result("market_fetch_warm", n_banks, warm),
+        ]
+
+
+def _engine_pass(universe, market):
+    engine = ResilienceEngine(universe)
+    banks = engine.metrics["Bank"]
+    engine.summary(banks)
+    engine.scorecard(banks)
+    engine.capital_stack(banks)
+    return engine, engine.valuation(banks, market, "bench")
+
+
+def bench_compute_and_render(n_banks, repeat):
+    universe = synthetic_universe(n_banks)
+    market = synthetic_market(universe)
+    results = [_result("metrics", n_banks, _time(lambda: _engine_pass(universe, market), repeat))]
+
+    engine, valuation = _engine_pass(universe, market)
+    banks = engine.metrics["Bank"]
+    kpi = engine.summary(banks)
+    builders = {
+        "figure_resilience_map": lambda: figures.resilience_map(engine.view(banks), kpi["median_stress_delta"]),
+        "figure_capital_stack": lambda: figures.capital_stack(engine.capital_stack(banks), kpi["avg_capital"]),
+        "figure_valuation_matrix": lambda: figures.valuation_matrix(valuation),
+    }
+    for stage, build in builders.items():
+        payload = len(build().to_json())
+        results.append(_result(stage, n_banks, _time(lambda build=build: build().to_json(), repeat), json_bytes=payload))
+
+    # Selection change on a warm FigureCache: only the changed traces are patched.
+    cache = figures.FigureCache()
+    subsets = [list(banks), list(banks[: max(1, n_banks * 9 // 10)])]
+    toggle = iter(range(10 ** 9))
+
+    def patch():
+        sel = subsets[next(toggle) % 2]
+        view = engine.view(sel)
+        cache.get("map", len(sel), lambda: figures.resilience_map_spec(view, kpi["median_stress_delta"]))
+
+    patch()
+    results.append(_result("figure_resilience_map_patch", n_banks, _time(patch, repeat)))
+
+    # Scorecard paging: the first page sorts once, later pages are slices of the kept order.
+    results.append(_result("scorecard_page", n_banks,
+                           _time(lambda: engine.scorecard_page(engine.select(), "Capital_Cushion", True, 1), repeat)))
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Print per-stage ratios against ``baseline``; return the stages slower than ``threshold``."""
+    old = {(r["stage"], r["n_banks"]): r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        prev = old.get((r["stage"], r["n_banks"]))
+        if prev is None or not prev["median_s"]:
+            continue
+        ratio = r["median_s"] / prev["median_s"]
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"{r['stage']:<26}{r['n_banks']:>6}  {prev['median_s']:9.4f}s → {r['median_s']:9.4f}s  x{ratio:5.2f}{flag}")
+        if flag:
+            regressions.append(r)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the resilience dashboard.")
+    parser.add_argument("--sizes", default="10,100,1000", help="comma-separated universe sizes")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--stages", default="pdf,market,compute", help="subset of pdf,market,compute")
+    parser.add_argument("--latency", type=float, default=0.02, help="stub quote latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="fraction of stub requests answered 429")
+    parser.add_argument("--workers", type=int, default=16, help="market fetch thread-pool size")
+    parser.add_argument("--output", help="write JSON results here (default: stdout)")
+    parser.add_argument("--baseline", help="earlier JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="slowdown ratio reported as a regression")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    stages = set(args.stages.split(","))
+    results = []
+    for n in sizes:
+        if "pdf" in stages:
+            results += bench_pdf(n, args.repeat)
+        if "market" in stages:
+            results += bench_market(n, args.repeat, args.latency, args.error_rate, args.workers)
+        if "compute" in stages:
+            results += bench_compute_and_render(n, args.repeat)
+        print(f"benchmarked {n} banks", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(UTC).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            regressions = compare(results, json.load(fh), args.threshold)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Data and computation core for the Bank Resilience Dashboard."""
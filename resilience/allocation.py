@@ -0,0 +1,65 @@
+"""Deposit allocation under the treasurer's counterparty limits.
+
+The problem is a linear program: maximize the cushion-weighted deposit
+Σ score_i·x_i subject to Σ x_i ≤ cash and 0 ≤ x_i ≤ u_i, where u_i is the
+smaller of the bank's own cap and the concentration limit (zero for banks
+below the minimum post-stress cushion). With one budget constraint and box
+bounds the greedy fill in score order is optimal, so a solve is one sort and
+one cumulative sum. The sort order is kept as a warm start and only
+recomputed when the scores change, so re-solving on a slider move is O(n).
+"""
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+Allocation = namedtuple("Allocation", ["frame", "allocated", "unallocated"])
+
+
+class DepositAllocator:
+    """Reusable solver; keeps the last score ordering as a warm start."""
+
+    def __init__(self):
+        self._order_key = None
+        self._order = None
+        self._lock = threading.Lock()
+
+    def _ranking(self, scores):
+        key = (scores.shape, scores.tobytes())
+        with self._lock:
+            if key != self._order_key:
+                self._order = np.argsort(-scores, kind="stable")
+                self._order_key = key
+            return self._order
+
+    def solve(self, df, cash, min_cushion=2.0, concentration=0.25, caps=None, score="Capital_Cushion"):
+        """Split ``cash`` across the banks in ``df``.
+
+        ``caps`` is a scalar or per-row array of maximum deposits (same unit as
+        ``cash``), ``concentration`` the largest share of ``cash`` any one bank
+        may hold, and ``min_cushion`` the minimum post-stress Capital Cushion
+        (percentage points) a bank needs to be eligible. Cash that cannot be
+        placed within the limits is reported as ``unallocated``.
+        """
+        scores = df[score].to_numpy(dtype=float)
+        cushion = df["Capital_Cushion"].to_numpy(dtype=float)
+        caps = np.broadcast_to(np.inf if caps is None else np.asarray(caps, dtype=float), scores.shape)
+        upper = np.where(cushion >= min_cushion, np.minimum(caps, concentration * cash), 0.0)
+        upper = np.nan_to_num(upper, nan=0.0).clip(min=0.0)
+
+        order = self._ranking(scores)
+        upper_sorted = upper[order]
+        placed_before = np.cumsum(upper_sorted) - upper_sorted
+        amounts = np.empty_like(upper)
+        amounts[order] = np.clip(cash - placed_before, 0.0, upper_sorted)
+
+        allocated = float(amounts.sum())
+        frame = pd.DataFrame({
+            "Bank": df["Bank"].to_numpy(),
+            "Capital_Cushion": cushion,
+            "Limit": upper,
+            "Deposit": amounts,
+            "Share": amounts / cash if cash else np.zeros_like(amounts),
+        }, index=df.index)
+        return Allocation(frame, allocated, max(float(cash) - allocated, 0.0))
@@ -0,0 +1,268 @@
+"""Read-only HTTP API serving precomputed resilience scorecards.
+
+Every response body is rendered once per data refresh, together with its gzip
+encoding, a strong ETag per encoding and the Cache-Control header, and swapped
+in atomically. Scorecard bodies carry only data, so a refresh that changes
+nothing keeps every ETag and pollers keep getting 304s. A request is a dict
+lookup plus a socket write: no computation and no upstream call. The stress
+table and quotes are refreshed in the background by ``BackgroundRefresher``,
+exactly as in the dashboard.
+
+    GET /v1/scorecards            all banks
+    GET /v1/scorecards/<key>      one bank, by ticker (``jpm``) or slug (``jpmorgan-chase``)
+    GET /healthz                  data source, version and age
+
+    python -m resilience.api --port 8080
+"""
+import argparse
+import gzip
+import hashlib
+import http.server
+import json
+import re
+import time
+from collections import namedtuple
+from email.utils import formatdate
+
+import pandas as pd
+
+from resilience import loader
+from resilience.data import PDF_URL, TICKER_MAP
+from resilience.engine import ResilienceEngine
+from resilience.refresh import BackgroundRefresher, Snapshot
+from resilience.resolver import TickerResolver, normalize_names
+
+Response = namedtuple("Response", ["status", "body", "gzip_body", "etag", "gzip_etag", "headers"])
+
+API_FIELDS = {
+    "Bank": "bank",
+    "Ticker": "ticker",
+    "Actual_CET1": "actual_cet1",
+    "Min_Stressed_CET1": "min_stressed_cet1",
+    "Stress_Delta": "stress_delta",
+    "Capital_Cushion": "capital_cushion",
+    "Total_Assets_B": "total_assets_b",
+    "Price_to_Book": "price_to_book",
+    "Quadrant": "quadrant",
+}
+GZIP_MIN_BYTES = 1024
+
+_SLUG = re.compile(r"[^a-z0-9]+")
+
+
+def slug(name):
+    return _SLUG.sub("-", name.lower()).strip("-")
+
+
+def _response(payload, status=200, max_age=60, stale=600):
+    body = json.dumps(payload, separators=(",", ":"), allow_nan=False).encode("utf-8")
+    digest = hashlib.sha1(body).hexdigest()[:20]
+    headers = [
+        ("Content-Type", "application/json"),
+        ("Cache-Control", f"public, max-age={max_age}, stale-while-revalidate={stale}"),
+        ("Vary", "Accept-Encoding"),
+    ]
+    gzip_body = gzip.compress(body, 6, mtime=0) if len(body) >= GZIP_MIN_BYTES else None
+    return Response(status, body, gzip_body, f'"{digest}"', f'"{digest}-gzip"', headers)
+
+
+def scorecard_records(engine, market):
+    """One dict per bank with the API field names; missing market values become ``None``."""
+    banks = engine.metrics["Bank"]
+    valuation = engine.valuation(banks, market, loader.frame_version(market))
+    merged = engine.metrics.merge(
+        valuation.frame[["Bank", "Ticker", "Price_to_Book", "Quadrant"]], on="Bank", how="left"
+    )
+    frame = merged[list(API_FIELDS)].rename(columns=API_FIELDS)
+    frame = frame.astype({c: "float64" for c in frame.select_dtypes("float32").columns}).round(4)
+    frame["quadrant"] = frame["quadrant"].astype(object)
+    frame = frame.astype(object).where(frame.notna(), None)
+    return frame.to_dict("records"), valuation
+
+
+def build_responses(stress, market, market_source, as_of, max_age=60):
+    """``{path: Response}`` for every endpoint, from one stress snapshot and market frame."""
+    engine = ResilienceEngine(stress.frame, stress.version)
+    records, valuation = scorecard_records(engine, market)
+    # No timestamp here: scorecard ETags must change only when the data does.
+    meta = {
+        "source": stress.source,
+        "version": stress.version,
+        "market": market_source,
+        "median_safety": None if valuation.frame.empty else round(float(valuation.median_safety), 4),
+        "median_pb": None if valuation.frame.empty else round(float(valuation.median_pb), 4),
+    }
+    responses = {
+        "/v1/scorecards": _response({**meta, "count": len(records), "banks": records}, max_age=max_age),
+        "/healthz": _response(
+            {**meta, "as_of": formatdate(as_of, usegmt=True), "generated_at": as_of}, max_age=0, stale=0,
+        ),
+    }
+    normalized = normalize_names(pd.Series([r["bank"] for r in records], dtype=object))
+    for record, plain in zip(records, normalized):
+        response = _response({**meta, **record}, max_age=max_age)
+        keys = {slug(record["bank"]), slug(plain)}
+        if record["ticker"]:
+            keys.add(record["ticker"].lower())
+        for key in keys - {""}:
+            responses[f"/v1/scorecards/{key}"] = response
+    return responses
+
+
+NOT_FOUND = _response({"error": "not found"}, status=404, max_age=60)
+
+
+class ScorecardService:
+    """Owns the refresher and the current response table."""
+
+    def __init__(self, url=PDF_URL, offline=False, live=False, interval=3600, max_age=60):
+        self.url = url
+        self.offline = offline
+        self.live = live
+        self.interval = interval
+        self.max_age = max_age
+        self.resolver = TickerResolver(TICKER_MAP)
+        self._client = None
+        self.refresher = BackgroundRefresher()
+
+    def _market(self, banks):
+        if not self.live:
+            return loader.approx_market_data(banks, self.resolver), "approx"
+        if self._client is None:
+            from resilience.market import MarketDataClient
+
+            self._client = MarketDataClient()
+        return loader.load_market_data(list(banks), self.resolver, self._client), "live"
+
+    def _build(self, stress):
+        market, market_source = self._market(stress.frame["Bank"])
+        return stress.source, build_responses(stress, market, market_source, time.time(), self.max_age)
+
+    def _load(self):
+        if self.offline:
+            stress = loader.load_cached_stress_data(self.url) or loader.fallback_stress_data()
+        else:
+            stress = loader.load_stress_data(self.url)
+        return self._build(stress)
+
+    def start(self):
+        """Serve the disk cache (or embedded data) right away, then refresh in the background."""
+        initial = loader.load_cached_stress_data(self.url) or loader.fallback_stress_data()
+        source, responses = self._build(initial)
+        self.refresher.register(
+            "scorecards", self._load, self.interval,
+            initial=Snapshot((source, responses), time.time(), source, None),
+            source_of=lambda value: value[0],
+        )
+        self.refresher.start()
+        return self
+
+    def lookup(self, path):
+        snapshot = self.refresher.get("scorecards")
+        responses = snapshot.value[1] if snapshot else {}
+        return responses.get(path.rstrip("/").lower() or "/", NOT_FOUND)
+
+
+class _HttpDate:
+    """The ``Date`` header value, formatted at most once a second."""
+
+    def __init__(self):
+        self._second = None
+        self._value = None
+
+    def __call__(self):
+        now = int(time.time())
+        if now != self._second:
+            self._value, self._second = formatdate(now, usegmt=True), now
+        return self._value
+
+
+def _etag_matches(header, etag):
+    if header is None:
+        return False
+    tags = [t.strip() for t in header.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def make_handler(service):
+    http_date = _HttpDate()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+        server_version = "resilience-api"
+
+        def date_time_string(self, timestamp=None):
+            return http_date() if timestamp is None else super().date_time_string(timestamp)
+
+        def _send(self, head_only=False):
+            response = service.lookup(self.path.split("?", 1)[0])
+            use_gzip = response.gzip_body is not None and "gzip" in self.headers.get("Accept-Encoding", "")
+            etag = response.gzip_etag if use_gzip else response.etag
+            if response.status == 200 and _etag_matches(self.headers.get("If-None-Match"), etag):
+                # A 304 has no body and must not claim a Content-Length other than the representation's.
+                self.send_response(304)
+                for key, value in response.headers:
+                    if key != "Content-Type":
+                        self.send_header(key, value)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            body = response.gzip_body if use_gzip else response.body
+            self.send_response(response.status)
+            for key, value in response.headers:
+                self.send_header(key, value)
+            self.send_header("ETag", etag)
+            if use_gzip:
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if not head_only:
+                self.wfile.write(body)
+
+        def do_GET(self):
+            self._send()
+
+        def do_HEAD(self):
+            self._send(head_only=True)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class ScorecardServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def serve(service, host="127.0.0.1", port=8080):
+    """Bind, start the service's refresher, and return the (not yet running) server."""
+    service.start()
+    return ScorecardServer((host, port), make_handler(service))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve bank resilience scorecards over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--url", default=PDF_URL, help="DFAST results PDF")
+    parser.add_argument("--offline", action="store_true", help="use only the on-disk cache, no network")
+    parser.add_argument("--live", action="store_true", help="serve live Price-to-Book instead of approximations")
+    parser.add_argument("--interval", type=float, default=3600, help="seconds between data refreshes")
+    parser.add_argument("--max-age", type=int, default=60, help="Cache-Control max-age for clients")
+    args = parser.parse_args(argv)
+    service = ScorecardService(args.url, args.offline, args.live, args.interval, args.max_age)
+    server = serve(service, args.host, args.port)
+    print(f"Serving scorecards on http://{args.host}:{server.server_address[1]}/v1/scorecards")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
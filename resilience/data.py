@@ -0,0 +1,30 @@
+"""Embedded reference data: fallback stress results, tickers and source URLs."""
+
+FALLBACK_DATA = [
+    {"Bank": "JPMorgan Chase", "Actual_CET1": 15.0, "Min_Stressed_CET1": 12.5, "Total_Assets_B": 3395},
+    {"Bank": "Bank of America", "Actual_CET1": 11.8, "Min_Stressed_CET1": 9.1, "Total_Assets_B": 2540},
+    {"Bank": "Citigroup", "Actual_CET1": 13.4, "Min_Stressed_CET1": 9.7, "Total_Assets_B": 1700},
+    {"Bank": "Wells Fargo", "Actual_CET1": 11.4, "Min_Stressed_CET1": 8.1, "Total_Assets_B": 1727},
+    {"Bank": "Goldman Sachs", "Actual_CET1": 14.4, "Min_Stressed_CET1": 8.5, "Total_Assets_B": 1600},
+    {"Bank": "Morgan Stanley", "Actual_CET1": 15.2, "Min_Stressed_CET1": 9.8, "Total_Assets_B": 1180},
+    {"Bank": "Capital One", "Actual_CET1": 12.9, "Min_Stressed_CET1": 7.7, "Total_Assets_B": 475},
+    {"Bank": "U.S. Bancorp", "Actual_CET1": 9.9, "Min_Stressed_CET1": 6.8, "Total_Assets_B": 663},
+    {"Bank": "PNC", "Actual_CET1": 9.8, "Min_Stressed_CET1": 7.1, "Total_Assets_B": 560},
+    {"Bank": "Truist", "Actual_CET1": 10.1, "Min_Stressed_CET1": 6.2, "Total_Assets_B": 535},
+]
+
+# Approximate P/B by ticker so the Valuation Matrix always renders without live data
+PB_APPROX = {
+    "JPM": 2.05, "BAC": 1.15, "C": 0.65, "WFC": 1.25, "GS": 1.40,
+    "MS": 1.75, "COF": 1.05, "USB": 1.35, "PNC": 1.50, "TFC": 0.90,
+}
+
+PDF_URL = "https://www.federalreserve.gov/publications/files/2025-dfast-results-20250627.pdf"
+
+TICKER_MAP = {
+    "JPMorgan Chase": "JPM", "Bank of America": "BAC", "Citigroup": "C",
+    "Wells Fargo": "WFC", "Goldman Sachs": "GS", "Morgan Stanley": "MS",
+    "Capital One": "COF", "U.S. Bancorp": "USB", "PNC": "PNC",
+    "Truist": "TFC", "Charles Schwab": "SCHW", "American Express": "AXP",
+    "State Street": "STT", "BNY Mellon": "BK",
+}
@@ -0,0 +1,179 @@
+"""Headless resilience engine with memoized derived frames.
+
+An engine is built once per data version. Every derived frame is memoized on
+the selected-bank set (and, for the valuation matrix, the market-data
+version), so a Streamlit rerun triggered by an unrelated widget is a
+dictionary lookup. Returned frames are shared between callers and must be
+treated as read-only.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from resilience.index import BankIndex
+from resilience.loader import frame_version
+from resilience.metrics import (
+    REGULATORY_MIN,
+    classify_quadrants,
+    compact_metrics,
+    compute_metrics,
+)
+from resilience.telemetry import TRACER
+from resilience.whatif import WhatIfGrid
+
+SCORECARD_COLUMNS = ["Bank", "Actual_CET1", "Min_Stressed_CET1", "Stress_Delta", "Capital_Cushion"]
+
+
+class ResilienceEngine:
+    """Metrics, selections and valuation frames for one version of the stress table."""
+
+    def __init__(self, frame, version=None, max_entries=64, metrics=None, floor=REGULATORY_MIN, index=None,
+                 parent=None, point=None):
+        self.version = version or frame_version(frame)
+        self.floor = floor
+        if metrics is None:
+            with TRACER.span("metrics.compute", rows=len(frame)):
+                metrics = compact_metrics(compute_metrics(frame, floor))
+        self.metrics = metrics
+        self.index = index or BankIndex(metrics)
+        # A what-if scenario engine: selections are shared with ``parent`` and
+        # views are its views with the grid columns at ``point`` swapped in.
+        self._parent = parent
+        self._point = point
+        self._max_entries = max_entries
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _memoized(self, key, build):
+        with TRACER.span(f"metrics.{key[0]}") as span:
+            with self._lock:
+                if key in self._memo:
+                    self._memo.move_to_end(key)
+                    span["cache"] = "hit"
+                    return self._memo[key]
+            span["cache"] = "miss"
+            value = build()
+            frame = getattr(value, "frame", value)
+            span["rows"] = len(frame) if isinstance(frame, pd.DataFrame) else None
+            with self._lock:
+                self._memo[key] = value
+                while len(self._memo) > self._max_entries:
+                    self._memo.popitem(last=False)
+            return value
+
+    @staticmethod
+    def _key(selection):
+        return frozenset(selection)
+
+    def view(self, selection):
+        """Metrics rows for the selected banks."""
+        sel = self._key(selection)
+
+        def build():
+            rows = self.index.by_banks(sel)
+            if self._parent is None:
+                return self.metrics.take(rows)
+            return self._parent.view(sel).assign(**self.whatif().columns(*self._point, rows))
+        return self._memoized(("view", sel), build)
+
+    def select(self, banks=None, tiers=None, assets=None):
+        """Bank names matching every given filter (``None`` = unconstrained), in frame order.
+
+        ``assets`` is a ``(low, high)`` range of total assets in $B; either end may be ``None``.
+        """
+        if self._parent is not None:
+            return self._parent.select(banks, tiers, assets)
+        key = (
+            None if banks is None else frozenset(banks),
+            None if tiers is None else frozenset(tiers),
+            None if assets is None else tuple(assets),
+        )
+
+        def build():
+            rows = self.index.positions(*key)
+            return tuple(self.metrics["Bank"].to_numpy()[rows])
+        return self._memoized(("select", key), build)
+
+    def scorecard_page(self, selection, sort_by="Stress_Delta", ascending=False, page=0, page_size=50):
+        """One page of the sorted scorecard and the total row count.
+
+        The sort order is computed once per selection and column and kept as a
+        position array, so paging through it is a slice and a ``take``.
+        """
+        sel = self._key(selection)
+
+        def order():
+            rows = self.index.by_banks(sel)
+            column = self.metrics[sort_by]
+            values = column.cat.codes.to_numpy() if column.dtype == "category" else column.to_numpy()
+            ranked = rows[np.argsort(values[rows], kind="stable")]
+            return ranked if ascending else ranked[::-1]
+        ranked = self._memoized(("scorecard_order", sel, sort_by, ascending), order)
+        start = page * page_size
+        return self.metrics.take(ranked[start:start + page_size])[SCORECARD_COLUMNS], len(ranked)
+
+    def summary(self, selection):
+        """KPI figures for the selected banks."""
+        def build():
+            df = self.view(selection)
+            safest = df.loc[df["Capital_Cushion"].idxmax()]
+            riskiest = df.loc[df["Capital_Cushion"].idxmin()]
+            return {
+                "count": len(df),
+                "avg_stress_delta": df["Stress_Delta"].mean(),
+                "median_stress_delta": df["Stress_Delta"].median(),
+                "avg_capital": df["Actual_CET1"].mean(),
+                "safest": safest, "riskiest": riskiest,
+            }
+        return self._memoized(("summary", self._key(selection)), build)
+
+    def scorecard(self, selection):
+        """Scorecard rows sorted by Stress Delta, most capital burned first."""
+        return self._memoized(
+            ("scorecard", self._key(selection)),
+            lambda: self.view(selection)[SCORECARD_COLUMNS]
+            .sort_values("Stress_Delta", ascending=False)
+            .reset_index(drop=True),
+        )
+
+    def capital_stack(self, selection):
+        """Selected rows sorted by Actual CET1 for the stacked bar chart."""
+        return self._memoized(
+            ("stack", self._key(selection)),
+            lambda: self.view(selection).sort_values("Actual_CET1", ascending=True),
+        )
+
+    def valuation(self, selection, market, market_version):
+        """Quadrant-classified valuation frame; ``market`` has Bank, Ticker and Price_to_Book."""
+        def build():
+            view = self.view(selection)
+            cols = [c for c in market.columns if c == "Bank" or c not in view.columns]
+            df_val = view.merge(market[cols], on="Bank", how="inner").dropna(subset=["Price_to_Book"])
+            return classify_quadrants(df_val)
+        return self._memoized(("valuation", self._key(selection), market_version), build)
+
+    def whatif(self):
+        """The floor × multiplier grid for this data version, built on first use."""
+        if self._parent is not None:
+            return self._parent.whatif()
+        return self._memoized(("whatif",), lambda: WhatIfGrid(self.metrics))
+
+    def scenario(self, floor=REGULATORY_MIN, multiplier=1.0):
+        """An engine over the nearest what-if grid point; ``self`` for the Fed's own scenario."""
+        if self._parent is not None:
+            return self._parent.scenario(floor, multiplier)
+        grid = self.whatif()
+        i, j = grid.index(floor, multiplier)
+        floor, multiplier = float(grid.floors[i]), float(grid.multipliers[j])
+        if floor == self.floor and multiplier == 1.0:
+            return self
+        return self._memoized(
+            ("scenario", i, j),
+            lambda: ResilienceEngine(
+                self.metrics, f"{self.version}:{floor:g}x{multiplier:g}", self._max_entries,
+                metrics=grid.metrics(floor, multiplier), floor=floor, index=self.index,
+                parent=self, point=(i, j),
+            ),
+        )
@@ -0,0 +1,179 @@
+"""Headless scorecard export for scheduled runs, without Streamlit.
+
+Uses the same loader, engine and figure specs as the dashboard and writes:
+
+- ``scorecard.parquet`` / ``scorecard.csv``: Stress Delta, Capital Cushion and
+  the capital-stack layers for every bank
+- ``valuation.parquet`` / ``valuation.csv``: Price-to-Book and the
+  valuation-matrix quadrant per bank
+- ``charts/<name>.html`` (and ``.png`` with ``--png`` if kaleido is installed)
+- ``manifest.json``: data source, version, timings and the files written
+
+Chart specs are built in the parent and rendered in a process pool; the HTML
+files share one ``plotly.min.js`` written next to them.
+
+    python -m resilience.export --output /srv/scorecards/$(date +%F)
+    python -m resilience.export --output out --offline --no-charts
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import UTC, datetime
+from pathlib import Path
+
+from resilience import figures, loader
+from resilience.data import PDF_URL, TICKER_MAP
+from resilience.engine import ResilienceEngine
+from resilience.resolver import TickerResolver
+from resilience.telemetry import TRACER
+
+SCORECARD_EXPORT_COLUMNS = [
+    "Bank", "Actual_CET1", "Min_Stressed_CET1", "Total_Assets_B", "Stress_Delta", "Capital_Cushion",
+    "Layer_Regulatory_Min", "Layer_Stress_Burn", "Layer_True_Excess",
+]
+VALUATION_EXPORT_COLUMNS = [
+    "Bank", "Ticker", "Min_Stressed_CET1", "Stress_Delta", "Price_to_Book", "Quadrant",
+]
+
+
+def load(url=PDF_URL, offline=False):
+    """Stress data as the dashboard would see it; ``offline`` reads only the disk cache."""
+    if offline:
+        return loader.load_cached_stress_data(url) or loader.fallback_stress_data()
+    return loader.load_stress_data(url)
+
+
+def market_frame(banks, resolver, live=False):
+    """Live quotes through ``MarketDataClient`` when ``live``, otherwise approximate P/B."""
+    if not live:
+        return loader.approx_market_data(banks, resolver), "approx"
+    from resilience.market import MarketDataClient
+
+    market = loader.load_market_data(list(banks), resolver, MarketDataClient())
+    return market, "live"
+
+
+def chart_specs(engine, valuation):
+    """``{name: FigureSpec}`` for every bank, matching the dashboard's charts."""
+    banks = engine.metrics["Bank"]
+    kpi = engine.summary(banks)
+    specs = {
+        "resilience_map": figures.resilience_map_spec(engine.view(banks), kpi["median_stress_delta"]),
+        "capital_stack": figures.capital_stack_spec(engine.capital_stack(banks), kpi["avg_capital"]),
+    }
+    if not valuation.frame.empty:
+        specs["valuation_matrix"] = figures.valuation_matrix_spec(valuation)
+    return specs
+
+
+def _render(job):
+    name, spec, directory, png = job
+    fig = spec.figure()
+    written = []
+    html = Path(directory) / f"{name}.html"
+    fig.write_html(html, include_plotlyjs="directory", full_html=True)
+    written.append(html.name)
+    if png:
+        fig.write_image(Path(directory) / f"{name}.png", width=1400, height=fig.layout.height or 600, scale=1)
+        written.append(f"{name}.png")
+    return written
+
+
+def render_charts(specs, directory, png=False, workers=None):
+    """Render ``specs`` to HTML (and PNG) across a process pool; returns file names."""
+    import plotly.offline
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / "plotly.min.js").write_text(plotly.offline.get_plotlyjs(), encoding="utf-8")
+    jobs = [(name, spec, str(directory), png) for name, spec in specs.items()]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    if workers == 1:
+        parts = map(_render, jobs)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_render, jobs))
+    return ["plotly.min.js", *(f for part in parts for f in part)]
+
+
+def _write_table(frame, directory, stem):
+    frame.to_parquet(directory / f"{stem}.parquet", index=False)
+    frame.round(4).to_csv(directory / f"{stem}.csv", index=False)
+    return [f"{stem}.parquet", f"{stem}.csv"]
+
+
+def export(output, url=PDF_URL, offline=False, live=False, charts=True, png=False, workers=None):
+    """Write the scorecard, valuation quadrants and charts to ``output``; returns the manifest."""
+    output = Path(output)
+    output.mkdir(parents=True, exist_ok=True)
+    timings, files = {}, []
+
+    def timed(stage, fn):
+        start = time.perf_counter()
+        with TRACER.span(f"export.{stage}"):
+            result = fn()
+        timings[stage] = round(time.perf_counter() - start, 4)
+        return result
+
+    stress = timed("load", lambda: load(url, offline))
+    engine = ResilienceEngine(stress.frame, stress.version)
+    banks = engine.metrics["Bank"]
+    resolver = TickerResolver(TICKER_MAP)
+    market, market_source = timed("market", lambda: market_frame(banks, resolver, live))
+    valuation = timed("metrics", lambda: engine.valuation(banks, market, loader.frame_version(market)))
+
+    scorecard = engine.metrics[SCORECARD_EXPORT_COLUMNS]
+    files += _write_table(scorecard, output, "scorecard")
+    files += _write_table(valuation.frame[VALUATION_EXPORT_COLUMNS], output, "valuation")
+
+    if charts:
+        if png and importlib.util.find_spec("kaleido") is None:
+            print("PNG export needs the 'kaleido' package; writing HTML only.", file=sys.stderr)
+            png = False
+        specs = timed("chart_specs", lambda: chart_specs(engine, valuation))
+        rendered = timed("chart_render", lambda: render_charts(specs, output / "charts", png, workers))
+        files += [f"charts/{name}" for name in rendered]
+
+    manifest = {
+        "generated_at": datetime.now(UTC).isoformat(timespec="seconds"),
+        "url": url,
+        "source": stress.source,
+        "version": stress.version,
+        "market": market_source,
+        "banks": len(scorecard),
+        "valued_banks": len(valuation.frame),
+        "median_safety": None if valuation.frame.empty else round(float(valuation.median_safety), 4),
+        "median_pb": None if valuation.frame.empty else round(float(valuation.median_pb), 4),
+        "timings_s": timings,
+        "files": files,
+    }
+    (output / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the bank resilience scorecard without Streamlit.")
+    parser.add_argument("--output", required=True, help="directory to write into (created if missing)")
+    parser.add_argument("--url", default=PDF_URL, help="DFAST results PDF")
+    parser.add_argument("--offline", action="store_true", help="use only the on-disk cache, no network")
+    parser.add_argument("--live", action="store_true", help="fetch live Price-to-Book instead of approximations")
+    parser.add_argument("--no-charts", dest="charts", action="store_false", help="skip chart rendering")
+    parser.add_argument("--png", action="store_true", help="also write PNG charts (requires kaleido)")
+    parser.add_argument("--workers", type=int, default=None, help="chart rendering processes")
+    parser.add_argument("--require-pdf", action="store_true",
+                        help="exit with status 2 if only the embedded fallback data was available")
+    args = parser.parse_args(argv)
+    manifest = export(args.output, args.url, args.offline, args.live, args.charts, args.png, args.workers)
+    print(f"{manifest['banks']} banks ({manifest['source']}, {manifest['version']}) -> {args.output}")
+    for stage, seconds in manifest["timings_s"].items():
+        print(f"  {stage:<13} {seconds:.3f}s")
+    if args.require_pdf and manifest["source"] == "fallback":
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,371 @@
+"""Plotly figures for the resilience map, capital stack, valuation matrix, allocation and trends.
+
+Each chart is described by a ``FigureSpec``: plain trace and layout dicts
+built straight from the frame's arrays, which is far cheaper than going
+through ``plotly.express``. ``FigureCache`` keeps the last figure per chart:
+the same data version and selection returns it untouched, and otherwise only
+the traces and layout keys whose content changed are updated in place.
+Scatter plots switch to WebGL (``Scattergl``) and drop their point labels
+past ``WEBGL_THRESHOLD`` points, so they stay responsive with thousands of banks.
+"""
+import hashlib
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from resilience.metrics import REGULATORY_MIN
+
+WEBGL_THRESHOLD = 500
+SIZE_MAX = 20  # largest bubble diameter in px, as plotly.express uses
+
+_DARK_MARGIN = {"t": 60, "b": 60}
+
+
+class FigureSpec(namedtuple("FigureSpec", ["traces", "layout"])):
+    """Trace dicts (each with a ``type``) and a layout dict for one chart."""
+
+    __slots__ = ()
+
+    def figure(self):
+        return go.Figure(data=self.traces, layout=self.layout)
+
+    @property
+    def kinds(self):
+        return tuple(t["type"] for t in self.traces)
+
+
+def _sig(value):
+    """Hashable content signature of a (possibly nested) trace or layout value."""
+    if isinstance(value, (np.ndarray, pd.Series, pd.Index)):
+        arr = np.asarray(value)
+        data = arr.tobytes() if arr.dtype != object else repr(arr.tolist()).encode()
+        return (arr.dtype.str, arr.shape, hashlib.blake2b(data, digest_size=16).digest())
+    if isinstance(value, dict):
+        return tuple(sorted((k, _sig(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_sig(v) for v in value)
+    return value
+
+
+def _scatter_type(n_points):
+    return "scattergl" if n_points > WEBGL_THRESHOLD else "scatter"
+
+
+def _bubble_marker(sizes):
+    sizes = np.nan_to_num(np.asarray(sizes, dtype=float))
+    peak = sizes.max() if len(sizes) else 1.0
+    return {"size": sizes, "sizemode": "area", "sizeref": 2.0 * (peak or 1.0) / SIZE_MAX ** 2}
+
+
+def _hline(y, color, text=None, dash="dash", opacity=1.0):
+    shape = {"type": "line", "xref": "x domain", "x0": 0, "x1": 1, "yref": "y", "y0": y, "y1": y,
+             "line": {"dash": dash, "color": color}, "opacity": opacity}
+    note = None if text is None else {"text": text, "xref": "x domain", "x": 1, "yref": "y", "y": y,
+                                      "showarrow": False, "xanchor": "right", "yanchor": "bottom"}
+    return shape, note
+
+
+def _vline(x, color, text=None, dash="dash", opacity=1.0, font_color=None):
+    shape = {"type": "line", "yref": "y domain", "y0": 0, "y1": 1, "xref": "x", "x0": x, "x1": x,
+             "line": {"dash": dash, "color": color}, "opacity": opacity}
+    note = None
+    if text is not None:
+        note = {"text": text, "yref": "y domain", "y": 1, "xref": "x", "x": x,
+                "showarrow": False, "xanchor": "left", "yanchor": "top"}
+        if font_color:
+            note["font"] = {"color": font_color}
+    return shape, note
+
+
+def resilience_map_spec(df, median_stress_delta, simulation=None, floor=REGULATORY_MIN):
+    """Stress Delta vs Min Stressed CET1, sized by total assets and coloured by Min CET1.
+
+    ``simulation`` is an optional Monte Carlo summary (see
+    ``resilience.simulation``); its 5th–95th percentile cushions become error bars.
+    """
+    kind = _scatter_type(len(df))
+    stressed = df["Min_Stressed_CET1"].to_numpy(dtype=float)
+    trace = {
+        "type": kind,
+        "x": df["Stress_Delta"].to_numpy(dtype=float),
+        "y": stressed,
+        "mode": "markers" if kind == "scattergl" else "markers+text",
+        "text": df["Bank"].to_numpy(dtype=object),
+        "textposition": "top center",
+        "textfont": {"size": 11},
+        "customdata": np.column_stack([df["Actual_CET1"].to_numpy(dtype=float),
+                                       df["Capital_Cushion"].to_numpy(dtype=float)]),
+        "hovertemplate": (
+            "<b>%{text}</b><br>Stress Delta (Capital Burned in Crisis %): %{x:.1f}"
+            "<br>Min Stressed CET1 (%): %{y:.1f}<br>Actual CET1: %{customdata[0]:.1f}"
+            "<br>Capital Cushion: %{customdata[1]:.1f}<extra></extra>"
+        ),
+        "marker": {**_bubble_marker(df["Total_Assets_B"]), "color": stressed, "coloraxis": "coloraxis"},
+        "showlegend": False,
+    }
+    if simulation is not None:
+        lower = simulation["Cushion_P5"].to_numpy(dtype=float) + floor
+        upper = simulation["Cushion_P95"].to_numpy(dtype=float) + floor
+        trace["error_y"] = {"type": "data", "symmetric": False,
+                            "array": np.clip(upper - stressed, 0, None),
+                            "arrayminus": np.clip(stressed - lower, 0, None)}
+    floor_line, floor_note = _hline(floor, "red", f"Regulatory Death Line ({floor:g}%)")
+    median, median_note = _vline(median_stress_delta, "gray", "Median Stress Loss", dash="dot")
+    layout = {
+        "title": {"text": "Bank Resilience Map — 2025 Stress Test"},
+        "xaxis": {"title": {"text": "← More Resilient  |  Stress Delta (%)  |  Less Resilient →"}},
+        "yaxis": {"title": {"text": "Min Stressed CET1 Ratio (%)"}},
+        "coloraxis": {"colorscale": "RdYlGn", "colorbar": {"title": {"text": "Min CET1 %"}}},
+        "shapes": [floor_line, median],
+        "annotations": [floor_note, median_note],
+        "template": "plotly_dark",
+        "height": 440,
+        "margin": _DARK_MARGIN,
+    }
+    return FigureSpec([trace], layout)
+
+
+def capital_stack_spec(df_sorted, avg_capital, floor=REGULATORY_MIN):
+    """Stacked horizontal bars: regulatory minimum, stress burn and true excess."""
+    banks = df_sorted["Bank"].to_numpy(dtype=object)
+    layers = [
+        ("Layer_Regulatory_Min", f"Regulatory Death Line ({floor:g}%)", {"color": "#ef4444"}),
+        ("Layer_Stress_Burn", "Capital Burned in Crisis", {"color": "#facc15", "pattern": {"shape": "/"}}),
+        ("Layer_True_Excess", "True Excess Capacity (Safety Margin)", {"color": "#22c55e"}),
+    ]
+    traces = [
+        {"type": "bar", "y": banks, "x": df_sorted[col].to_numpy(dtype=float), "name": name,
+         "orientation": "h", "marker": marker}
+        for col, name, marker in layers
+    ]
+    avg, avg_note = _vline(avg_capital, "white", f"Avg Capital {avg_capital:.1f}%", font_color="white")
+    layout = {
+        "barmode": "stack",
+        "title": {"text": "The Capital Stack: Who Has a Real Safety Margin?"},
+        "xaxis": {"title": {"text": "CET1 Capital Ratio (%)"}},
+        "shapes": [avg],
+        "annotations": [avg_note],
+        "template": "plotly_dark",
+        "height": 480,
+        "legend": {"orientation": "h", "yanchor": "bottom", "y": -0.25, "xanchor": "center", "x": 0.5},
+        "margin": {"l": 10, "t": 60, "b": 80},
+    }
+    return FigureSpec(traces, layout)
+
+
+def valuation_matrix_spec(valuation):
+    """Safety vs Price-to-Book split at the medians; takes a ``metrics.Valuation``."""
+    df_val = valuation.frame
+    kind = _scatter_type(len(df_val))
+    safety = df_val["Min_Stressed_CET1"].to_numpy(dtype=float)
+    pb = df_val["Price_to_Book"].to_numpy(dtype=float)
+    trace = {
+        "type": kind,
+        "x": safety,
+        "y": pb,
+        "mode": "markers" if kind == "scattergl" else "markers+text",
+        "text": df_val["Ticker"].to_numpy(dtype=object),
+        "textposition": "top center",
+        "textfont": {"size": 12},
+        "customdata": np.column_stack([
+            df_val["Bank"].to_numpy(dtype=object),
+            df_val["Actual_CET1"].to_numpy(dtype=float),
+            df_val["Stress_Delta"].to_numpy(dtype=float),
+            df_val["Quadrant"].astype(str).to_numpy(dtype=object),
+        ]),
+        "hovertemplate": (
+            "<b>%{text}</b> — %{customdata[0]}<br>Safety Score (Min Stressed CET1 %): %{x:.1f}"
+            "<br>Market Price (Price-to-Book): %{y:.2f}<br>Actual CET1: %{customdata[1]:.1f}"
+            "<br>Stress Delta: %{customdata[2]:.1f}<br>Quadrant: %{customdata[3]}<extra></extra>"
+        ),
+        "marker": {**_bubble_marker(df_val["Total_Assets_B"]), "color": "royalblue",
+                   "line": {"width": 1, "color": "white"}},
+        "showlegend": False,
+    }
+    pb_line, _ = _hline(valuation.median_pb, "gray", opacity=0.5)
+    safety_line, _ = _vline(valuation.median_safety, "gray", opacity=0.5)
+    annotations = []
+    if len(df_val):
+        annotations = [
+            {"x": safety.max(), "y": pb.min(), "text": "BARGAINS<br>(Safe & Cheap)", "showarrow": False,
+             "font": {"size": 13, "color": "#22c55e"}, "xanchor": "right", "yanchor": "bottom"},
+            {"x": safety.min(), "y": pb.max(), "text": "RISKY PREMIUM<br>(Unsafe & Expensive)", "showarrow": False,
+             "font": {"size": 13, "color": "#ef4444"}, "xanchor": "left", "yanchor": "top"},
+        ]
+    layout = {
+        "title": {"text": "Are You Overpaying for Risk?"},
+        "xaxis": {"title": {"text": "← Riskier  |  Safety Score (Min Stressed CET1 %)  |  Safer →"}},
+        "yaxis": {"title": {"text": "← Cheaper  |  Price-to-Book  |  Expensive →"}},
+        "shapes": [pb_line, safety_line],
+        "annotations": annotations,
+        "template": "plotly_dark",
+        "height": 500,
+        "margin": _DARK_MARGIN,
+    }
+    return FigureSpec([trace], layout)
+
+
+def allocation_bars_spec(placed):
+    """Horizontal bars of the optimal deposit split (``allocation.Allocation.frame`` rows)."""
+    trace = {
+        "type": "bar", "orientation": "h", "marker": {"color": "#3b82f6"},
+        "y": placed["Bank"].to_numpy(dtype=object), "x": placed["Deposit"].to_numpy(dtype=float),
+        "customdata": placed["Capital_Cushion"].to_numpy(dtype=float),
+        "hovertemplate": "%{y}: $%{x:,.0f}M<br>Cushion %{customdata:.1f}%<extra></extra>",
+    }
+    layout = {
+        "title": {"text": "Optimal Split (highest post-stress cushion first)"},
+        "xaxis": {"title": {"text": "Deposit ($M)"}},
+        "template": "plotly_dark",
+        "height": 360,
+        "margin": {"l": 10, "t": 60, "b": 40},
+    }
+    return FigureSpec([trace], layout)
+
+
+def stress_trend_spec(trend):
+    """One line per bank across years; takes the Bank × Year table from ``history.stress_delta_trend``."""
+    years = trend.columns.to_numpy(dtype=int)
+    traces = [
+        {"type": "scatter", "mode": "lines+markers", "name": bank, "x": years,
+         "y": row.to_numpy(dtype=float), "connectgaps": False,
+         "hovertemplate": f"<b>{bank}</b><br>%{{x}}: %{{y:.1f}} pts<extra></extra>"}
+        for bank, row in trend.iterrows()
+    ]
+    layout = {
+        "title": {"text": "Stress Delta by Test Year"},
+        "xaxis": {"title": {"text": "DFAST Year"}, "dtick": 1},
+        "yaxis": {"title": {"text": "Stress Delta (pts of CET1 burned)"}},
+        "template": "plotly_dark",
+        "height": 460,
+        "margin": _DARK_MARGIN,
+    }
+    return FigureSpec(traces, layout)
+
+
+def market_vs_fed_spec(df):
+    """Stress Delta against realized volatility; ``df`` has Bank, Ticker, Stress_Delta and the overlay columns."""
+    kind = _scatter_type(len(df))
+    trace = {
+        "type": kind,
+        "x": df["Stress_Delta"].to_numpy(dtype=float),
+        "y": df["Volatility_Ann"].to_numpy(dtype=float),
+        "mode": "markers" if kind == "scattergl" else "markers+text",
+        "text": df["Ticker"].to_numpy(dtype=object),
+        "textposition": "top center",
+        "customdata": np.column_stack([
+            df["Bank"].to_numpy(dtype=object),
+            df["Max_Drawdown"].to_numpy(dtype=float),
+            df["Peer_Corr"].to_numpy(dtype=float),
+        ]),
+        "hovertemplate": (
+            "<b>%{text}</b> — %{customdata[0]}<br>Stress Delta: %{x:.1f}<br>Volatility: %{y:.1f}%"
+            "<br>Max Drawdown: %{customdata[1]:.1f}%<br>Peer Correlation: %{customdata[2]:.2f}<extra></extra>"
+        ),
+        "marker": {"size": 12, "color": df["Max_Drawdown"].to_numpy(dtype=float), "coloraxis": "coloraxis"},
+        "showlegend": False,
+    }
+    layout = {
+        "title": {"text": "Does the Market Agree with the Fed?"},
+        "xaxis": {"title": {"text": "Stress Delta (Fed view, %)"}},
+        "yaxis": {"title": {"text": "Annualized Volatility (market view, %)"}},
+        "coloraxis": {"colorscale": "RdYlGn", "colorbar": {"title": {"text": "Max DD %"}}},
+        "template": "plotly_dark",
+        "height": 420,
+        "margin": _DARK_MARGIN,
+    }
+    return FigureSpec([trace], layout)
+
+
+def resilience_map(df, median_stress_delta, simulation=None, floor=REGULATORY_MIN):
+    return resilience_map_spec(df, median_stress_delta, simulation, floor).figure()
+
+
+def capital_stack(df_sorted, avg_capital, floor=REGULATORY_MIN):
+    return capital_stack_spec(df_sorted, avg_capital, floor).figure()
+
+
+def valuation_matrix(valuation):
+    return valuation_matrix_spec(valuation).figure()
+
+
+def allocation_bars(placed):
+    return allocation_bars_spec(placed).figure()
+
+
+def stress_trend(trend):
+    return stress_trend_spec(trend).figure()
+
+
+def market_vs_fed(df):
+    return market_vs_fed_spec(df).figure()
+
+
+def patch_valuation_points(fig, live, update):
+    """Move only ``update.rows`` of a valuation-matrix figure to their live P/B.
+
+    ``live`` is a ``streaming.LiveValuation`` built from the same frame as
+    ``fig``; quadrant labels in the hover text follow ``update.quadrant_rows``
+    and the horizontal median line follows ``update.median_pb``.
+    """
+    if not len(update.rows):
+        return fig
+    trace = fig.data[0]
+    with fig.batch_update():
+        y = np.array(trace.y, dtype=float)
+        y[update.rows] = live.pb[update.rows]
+        trace.y = y
+        if len(update.quadrant_rows):
+            custom = np.array(trace.customdata, dtype=object)
+            custom[update.quadrant_rows, 3] = live.quadrant[update.quadrant_rows]
+            trace.customdata = custom
+        fig.layout.shapes[0].update(y0=update.median_pb, y1=update.median_pb)
+        if fig.layout.annotations:
+            fig.layout.annotations[0].y = float(y.min())
+            fig.layout.annotations[1].y = float(y.max())
+    return fig
+
+
+_Entry = namedtuple("_Entry", ["key", "figure", "kinds", "trace_sigs", "trace_keys", "layout_sigs"])
+
+
+class FigureCache:
+    """Last figure per chart, reused on an identical key and patched in place otherwise.
+
+    Figures are mutated on patch, so keep one cache per Streamlit session
+    (reruns within a session are sequential), not one per process.
+    """
+
+    def __init__(self):
+        self._entries = {}
+
+    def get(self, name, key, build_spec):
+        """Return ``(figure, outcome)``; outcome is ``"hit"``, ``"patch"`` or ``"miss"``."""
+        entry = self._entries.get(name)
+        if entry is not None and entry.key == key:
+            return entry.figure, "hit"
+        spec = build_spec()
+        trace_sigs = [_sig(t) for t in spec.traces]
+        trace_keys = [frozenset(t) for t in spec.traces]
+        layout_sigs = {k: _sig(v) for k, v in spec.layout.items()}
+        if entry is not None and entry.kinds == spec.kinds:
+            fig = entry.figure
+            with fig.batch_update():
+                for i, (old, new) in enumerate(zip(entry.trace_sigs, trace_sigs)):
+                    if old != new:
+                        # Keys the new spec no longer sets are reset, or e.g. error bars would linger.
+                        patch = dict.fromkeys(entry.trace_keys[i] - trace_keys[i])
+                        patch.update(spec.traces[i])
+                        patch.pop("type", None)
+                        fig.data[i].update(patch, overwrite=True)
+                changed = {k: v for k, v in spec.layout.items() if entry.layout_sigs.get(k) != layout_sigs[k]}
+                changed.update(dict.fromkeys(entry.layout_sigs.keys() - layout_sigs.keys()))
+                if changed:
+                    fig.update_layout(changed, overwrite=True)
+            outcome = "patch"
+        else:
+            fig, outcome = spec.figure(), "miss"
+        self._entries[name] = _Entry(key, fig, spec.kinds, trace_sigs, trace_keys, layout_sigs)
+        return fig, outcome
@@ -0,0 +1,165 @@
+"""Multi-year DFAST history: incremental ingestion into a year-partitioned store.
+
+Each year's results PDF is parsed once into ``<root>/year=YYYY/part-0.parquet``
+(hive-style partitions, readable by pandas/pyarrow/duckdb as one dataset).
+Ingestion skips years already in the store, reuses the dashboard's cached
+parse when the URL matches, and aligns bank names across years through the
+ticker resolver's canonical names. Trend views read only the store.
+
+    python -m resilience.history            # ingest missing years
+    python -m resilience.history --list     # show what is stored
+"""
+import argparse
+import logging
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from resilience.data import TICKER_MAP
+from resilience.metrics import compute_metrics
+from resilience.pdf_extract import PARSER_VERSION
+from resilience.resolver import TickerResolver
+from resilience.store import CACHE_DIR, StressTableStore
+
+log = logging.getLogger(__name__)
+
+_FED = "https://www.federalreserve.gov/publications/files/"
+
+DFAST_RESULTS_URLS = {
+    2018: _FED + "2018-dfast-methodology-results-20180621.pdf",
+    2019: _FED + "2019-dfast-results-20190621.pdf",
+    2020: _FED + "2020-dfast-results-20200625.pdf",
+    2021: _FED + "2021-dfast-results-20210624.pdf",
+    2022: _FED + "2022-dfast-results-20220623.pdf",
+    2023: _FED + "2023-dfast-results-20230628.pdf",
+    2024: _FED + "2024-dfast-results-20240626.pdf",
+    2025: _FED + "2025-dfast-results-20250627.pdf",
+}
+
+HISTORY_COLUMNS = ["Bank", "Bank_Raw", "Actual_CET1", "Min_Stressed_CET1", "Total_Assets_B"]
+
+
+class HistoryStore:
+    """Year-partitioned Parquet dataset of parsed stress tables."""
+
+    def __init__(self, root=CACHE_DIR / "history"):
+        self.root = Path(root)
+
+    def _partition(self, year):
+        return self.root / f"year={int(year)}" / "part-0.parquet"
+
+    def years(self):
+        return sorted(int(p.parent.name.split("=", 1)[1]) for p in self.root.glob("year=*/part-0.parquet"))
+
+    def write(self, year, frame):
+        path = self._partition(year)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        frame[HISTORY_COLUMNS].reset_index(drop=True).to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+
+    def read(self, years=None):
+        """All stored rows (or only ``years``) with a ``Year`` column, oldest first."""
+        wanted = self.years() if years is None else sorted(set(years) & set(self.years()))
+        if not wanted:
+            return pd.DataFrame(columns=["Year", *HISTORY_COLUMNS])
+        parts = [pd.read_parquet(self._partition(y)).assign(Year=y) for y in wanted]
+        return pd.concat(parts, ignore_index=True)[["Year", *HISTORY_COLUMNS]]
+
+
+def history_names(banks, resolver):
+    """The names ``banks`` are stored under: the resolver's canonical name where it has one."""
+    banks = pd.Series(list(banks), dtype="object")
+    return resolver.resolve(banks).canonical.fillna(banks)
+
+
+def canonicalize(frame, resolver):
+    """Replace PDF bank names with the resolver's canonical names where it has one."""
+    return frame.assign(Bank_Raw=frame["Bank"], Bank=history_names(frame["Bank"], resolver).to_numpy())
+
+
+def _download_and_parse(url, timeout=60):
+    import requests
+
+    from resilience.pdf_extract import parse_stress_pdf
+
+    resp = requests.get(url, timeout=timeout)
+    resp.raise_for_status()
+    return parse_stress_pdf(resp.content)
+
+
+def ingest(urls=None, store=None, resolver=None, fetch=_download_and_parse, table_store=None):
+    """Parse and store every year in ``urls`` that the store does not have yet.
+
+    Returns ``(ingested_years, failures)`` where ``failures`` maps year to a
+    short reason; failed years are retried on the next run.
+    """
+    urls = DFAST_RESULTS_URLS if urls is None else urls
+    store = store or HistoryStore()
+    resolver = resolver or TickerResolver(TICKER_MAP)
+    table_store = table_store or StressTableStore()
+    have = set(store.years())
+    ingested, failures = [], {}
+    for year, url in sorted(urls.items()):
+        if year in have:
+            continue
+        frame, _ = table_store.load(url, PARSER_VERSION)
+        if frame is None:
+            try:
+                frame = fetch(url)
+            except Exception as exc:
+                log.warning("could not ingest the %s results", year, exc_info=True)
+                failures[year] = f"{type(exc).__name__}: {exc}"
+                continue
+        if frame is None or frame.empty:
+            failures[year] = "CET1 table not found"
+            continue
+        store.write(year, canonicalize(frame, resolver))
+        ingested.append(year)
+    return ingested, failures
+
+
+def with_metrics(history):
+    """History rows with Stress Delta, Capital Cushion and the capital-stack layers."""
+    return compute_metrics(history) if len(history) else history
+
+
+def stress_delta_trend(history):
+    """Bank × Year table of Stress Delta."""
+    return with_metrics(history).pivot_table(index="Bank", columns="Year", values="Stress_Delta", aggfunc="mean")
+
+
+def cushion_yoy(history):
+    """Bank × Year table of the year-over-year change in Capital Cushion (percentage points)."""
+    cushion = with_metrics(history).pivot_table(
+        index="Bank", columns="Year", values="Capital_Cushion", aggfunc="mean"
+    )
+    return cushion.diff(axis=1).iloc[:, 1:]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest DFAST results PDFs into the history store.")
+    parser.add_argument("--years", help="comma-separated subset of years to ingest")
+    parser.add_argument("--list", action="store_true", help="list stored years and exit")
+    args = parser.parse_args(argv)
+    store = HistoryStore()
+    if args.list:
+        for year in store.years():
+            print(year, len(store.read([year])), "banks")
+        return
+    urls = DFAST_RESULTS_URLS
+    if args.years:
+        wanted = {int(y) for y in args.years.split(",")}
+        urls = {y: u for y, u in urls.items() if y in wanted}
+    ingested, failures = ingest(urls, store)
+    for year in ingested:
+        print(f"{year}: ingested")
+    for year, reason in failures.items():
+        print(f"{year}: failed ({reason})")
+    if not ingested and not failures:
+        print("history store is up to date")
+
+
+if __name__ == "__main__":
+    main()
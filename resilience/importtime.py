@@ -0,0 +1,78 @@
+"""Startup-time report: what each component adds to a cold import.
+
+Runs ``python -X importtime`` in a fresh interpreter per component, after
+importing the modules every page load needs anyway, so each figure is the
+marginal cost of that component. Usage::
+
+    python -m resilience.importtime [--json]
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+
+# Imported on every script run; measured first and used as the baseline for the rest.
+BASELINE = ["streamlit", "pandas", "plotly.express", "plotly.graph_objects"]
+
+COMPONENTS = {
+    "dashboard core (resilience package)": [
+        "resilience.loader", "resilience.engine", "resilience.market", "resilience.refresh",
+        "resilience.shared", "resilience.simulation", "resilience.allocation", "resilience.resolver",
+    ],
+    "PDF download (requests)": ["requests"],
+    "PDF parsing (pdfplumber)": ["pdfplumber"],
+    "PDF page index (pypdfium2)": ["pypdfium2"],
+    "Parquet reader (pyarrow.parquet)": ["pyarrow", "pyarrow.parquet"],
+    "Market data (yfinance)": ["yfinance"],
+    "Market session (curl_cffi)": ["curl_cffi.requests"],
+}
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def _top_level_us(stderr):
+    """Sum of cumulative microseconds over the top-level imports in an importtime log."""
+    total = 0
+    for match in _LINE.finditer(stderr):
+        if len(match.group(3)) == 1:  # one space of indent: a direct import
+            total += int(match.group(2))
+    return total
+
+
+def measure(modules, preload=()):
+    """Marginal cold-import time of ``modules`` in ms after ``preload``, or ``None`` if missing."""
+    code = "".join(f"import {m}\n" for m in preload)
+    code += "import sys; sys.stderr.write('--measure--\\n')\n"
+    code += "".join(f"import {m}\n" for m in modules)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=False,
+    )
+    if proc.returncode != 0:
+        return None
+    return _top_level_us(proc.stderr.split("--measure--", 1)[-1]) / 1000.0
+
+
+def report():
+    rows = [{"component": "baseline (" + ", ".join(BASELINE) + ")", "ms": measure(BASELINE)}]
+    for name, modules in COMPONENTS.items():
+        rows.append({"component": name, "ms": measure(modules, preload=BASELINE)})
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--json", action="store_true", help="emit JSON instead of a table")
+    args = parser.parse_args(argv)
+    rows = report()
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    width = max(len(r["component"]) for r in rows)
+    for row in rows:
+        ms = "not installed" if row["ms"] is None else f"{row['ms']:8.1f} ms"
+        print(f"{row['component']:<{width}}  {ms}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Positional index over the engine's working set for fast bank, tier and asset-size filters.
+
+Filters resolve to sorted row positions without scanning or copying the
+frame: bank names through a hash index, tiers through precomputed position
+arrays, and asset ranges through a binary search over the rows pre-sorted by
+total assets. Callers combine the positions and ``take`` only the rows they need.
+"""
+import numpy as np
+import pandas as pd
+
+
+class BankIndex:
+    """Row positions of a metrics frame by bank name, asset tier and total assets."""
+
+    def __init__(self, metrics):
+        self.size = len(metrics)
+        self._names = pd.Index(metrics["Bank"].astype(str).to_numpy())
+        assets = metrics["Total_Assets_B"].to_numpy(dtype=float)
+        self._by_assets = np.argsort(assets, kind="stable")
+        self._assets_sorted = assets[self._by_assets]
+        self.tiers = list(metrics["Tier"].cat.categories) if "Tier" in metrics else []
+        codes = metrics["Tier"].cat.codes.to_numpy() if "Tier" in metrics else np.zeros(0, dtype=int)
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(self.tiers) + 1))
+        self._tier_rows = {t: order[bounds[k]:bounds[k + 1]] for k, t in enumerate(self.tiers)}
+
+    def by_banks(self, banks):
+        rows = self._names.get_indexer(pd.Index([str(b) for b in banks]))
+        return np.unique(rows[rows >= 0])
+
+    def by_tiers(self, tiers):
+        parts = [self._tier_rows[t] for t in tiers if t in self._tier_rows]
+        return np.unique(np.concatenate(parts)) if parts else np.zeros(0, dtype=int)
+
+    def by_assets(self, low=None, high=None):
+        lo = 0 if low is None else np.searchsorted(self._assets_sorted, low, side="left")
+        hi = self.size if high is None else np.searchsorted(self._assets_sorted, high, side="right")
+        return np.sort(self._by_assets[lo:hi])
+
+    def positions(self, banks=None, tiers=None, assets=None):
+        """Sorted positions matching every given filter; ``None`` means no constraint."""
+        rows = None
+        for part in (
+            None if banks is None else self.by_banks(banks),
+            None if tiers is None else self.by_tiers(tiers),
+            None if assets is None else self.by_assets(*assets),
+        ):
+            if part is not None:
+                rows = part if rows is None else np.intersect1d(rows, part, assume_unique=True)
+        return np.arange(self.size) if rows is None else rows
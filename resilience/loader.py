@@ -0,0 +1,95 @@
+"""Load the stress table and market quotes, independent of any UI."""
+import logging
+from collections import namedtuple
+
+import pandas as pd
+
+from resilience.data import FALLBACK_DATA, PB_APPROX, PDF_URL
+from resilience.pdf_extract import PARSER_VERSION, TABLES, parse_stress_tables
+from resilience.store import StressTableStore, fetch_stress_table
+from resilience.telemetry import TRACER
+
+log = logging.getLogger(__name__)
+
+StressData = namedtuple("StressData", ["frame", "version", "source"])
+
+MARKET_COLUMNS = ["Bank", "Ticker", "Price_to_Book", "Div_Yield"]
+
+
+def frame_version(frame):
+    """Stable content hash of a frame, used to key memoized derived data."""
+    return format(int(pd.util.hash_pandas_object(frame, index=False).sum()) & (2 ** 64 - 1), "016x")
+
+
+def load_stress_data(url=PDF_URL, store=None):
+    """Serve the on-disk parse, revalidated against the PDF; fall back to embedded data."""
+    with TRACER.span("load_stress_data") as span:
+        try:
+            frame = fetch_stress_table(url, parse_stress_tables, store=store, version=PARSER_VERSION)
+        except Exception:
+            log.warning("stress table refresh failed", exc_info=True)
+            frame = None
+        if frame is None or frame.empty:
+            data = fallback_stress_data()
+        else:
+            frame = frame.reset_index(drop=True)
+            data = StressData(frame, frame_version(frame), "pdf")
+        span["rows"] = len(data.frame)
+        span["source"] = data.source
+        return data
+
+
+def load_cached_stress_data(url=PDF_URL, store=None):
+    """The last good parse from the on-disk store, without touching the network."""
+    frame, _ = (store or StressTableStore()).load(url)
+    if frame is None or frame.empty:
+        return None
+    frame = frame.reset_index(drop=True)
+    return StressData(frame, frame_version(frame), "pdf")
+
+
+def load_stress_tables(url=PDF_URL, store=None):
+    """The supplementary tables (``pdf_extract.TABLES``) of the last good parse, from disk only.
+
+    Tables that are not stored yet come back as empty frames with their typed columns.
+    """
+    stored = (store or StressTableStore()).load_tables(url)
+    return {
+        name: stored.get(name, pd.DataFrame(columns=list(spec.schema)).astype(spec.schema))
+        for name, spec in TABLES.items()
+    }
+
+
+def fallback_stress_data():
+    """The embedded table, used until a PDF parse is available."""
+    frame = pd.DataFrame(FALLBACK_DATA)
+    return StressData(frame, frame_version(frame), "fallback")
+
+
+def load_market_data(banks, resolver, client=None, quotes=None):
+    """Price-to-Book and Dividend Yield for ``banks``.
+
+    Quotes come from ``quotes`` (a ``{ticker: quote}`` snapshot) when given,
+    otherwise they are fetched through ``client``.
+    """
+    with TRACER.span("fetch_market_data") as span:
+        resolved = resolver.resolve(banks).tickers
+        tickers = {bank: sym for bank, sym in zip(banks, resolved) if sym}
+        span["cache"] = "hit" if quotes is not None else "miss"
+        if quotes is None:
+            quotes = client.quotes(tickers.values())
+        rows = []
+        for bank, ticker in tickers.items():
+            quote = quotes.get(ticker) or {"Price_to_Book": None, "Div_Yield": None}
+            rows.append({"Bank": bank, "Ticker": ticker, **quote})
+        span["rows"] = len(rows)
+        return pd.DataFrame(rows, columns=MARKET_COLUMNS)
+
+
+def approx_market_data(banks, resolver):
+    """Approximate Price-to-Book from the embedded table, used when live quotes are off."""
+    banks = list(banks)
+    tickers = resolver.resolve(banks).tickers.to_numpy()
+    return pd.DataFrame({"Bank": banks, "Ticker": tickers}).assign(
+        Price_to_Book=lambda d: d["Ticker"].map(PB_APPROX)
+    )
@@ -0,0 +1,191 @@
+"""Concurrent market-data fetcher with per-ticker caching.
+
+Quotes are fetched on a bounded thread pool over one shared HTTP session:
+yfinance keeps a single process-wide cookie/crumb store, so per-thread
+sessions would not isolate anything and would only race to replace it. Each
+ticker gets retries with exponential backoff and its own circuit breaker, so
+one slow or rate-limited symbol is skipped instead of stalling the whole
+page. Results are cached per ticker, so changing the bank selection only
+fetches symbols that are not cached yet.
+"""
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from resilience.telemetry import TRACER
+
+log = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Opens after ``threshold`` consecutive failures and half-opens after ``cooldown`` seconds."""
+
+    def __init__(self, threshold=3, cooldown=300.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            # Half-open: let one probe through once the cooldown has elapsed.
+            if time.monotonic() - self.opened_at >= self.cooldown:
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+
+class TickerCache:
+    """Thread-safe per-ticker TTL cache."""
+
+    def __init__(self, ttl=3600.0):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, ticker):
+        with self._lock:
+            entry = self._entries.get(ticker)
+        if entry is None or time.time() - entry[1] > self.ttl:
+            return None
+        return entry[0]
+
+    def put(self, ticker, value, fetched_at=None):
+        with self._lock:
+            self._entries[ticker] = (value, fetched_at or time.time())
+
+    def __contains__(self, ticker):
+        return self.get(ticker) is not None
+
+
+_yahoo_session = None
+_yahoo_session_lock = threading.Lock()
+
+
+def yahoo_session():
+    """The process-wide Yahoo session; yfinance shares one cookie/crumb across threads."""
+    global _yahoo_session
+    with _yahoo_session_lock:
+        if _yahoo_session is None:
+            from curl_cffi import requests as curl_requests
+
+            _yahoo_session = curl_requests.Session(impersonate="chrome")
+        return _yahoo_session
+
+
+def yahoo_quote(ticker, session):
+    """Price-to-Book and dividend yield (%) for ``ticker`` from Yahoo Finance."""
+    import yfinance as yf
+
+    info = yf.Ticker(ticker, session=session).info
+    return {
+        "Price_to_Book": info.get("priceToBook", None),
+        "Div_Yield": (info.get("dividendYield", 0) or 0) * 100,
+    }
+
+
+class MarketDataClient:
+    """Fetch quotes for many tickers concurrently, caching each ticker separately."""
+
+    def __init__(self, fetch_quote=yahoo_quote, session_factory=yahoo_session, max_workers=8,
+                 retries=2, backoff=0.5, ttl=3600.0, deadline=20.0,
+                 breaker_threshold=3, breaker_cooldown=300.0):
+        self.fetch_quote = fetch_quote
+        self.retries = retries
+        self.backoff = backoff
+        self.deadline = deadline
+        self.cache = TickerCache(ttl)
+        self._session_factory = session_factory
+        self._session = None
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="market")
+        self._breaker_args = (breaker_threshold, breaker_cooldown)
+        self._breakers = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """The HTTP session every worker shares, created on first use."""
+        with self._lock:
+            if self._session is None:
+                self._session = self._session_factory()
+            return self._session
+
+    def breaker(self, ticker):
+        with self._lock:
+            if ticker not in self._breakers:
+                self._breakers[ticker] = CircuitBreaker(*self._breaker_args)
+            return self._breakers[ticker]
+
+    def _fetch_with_retry(self, ticker):
+        breaker = self.breaker(ticker)
+        for attempt in range(self.retries + 1):
+            if not breaker.allow():
+                return None
+            try:
+                with TRACER.span("market_quote_http", ticker=ticker):
+                    quote = self.fetch_quote(ticker, self.session)
+            except Exception:
+                log.debug("quote for %s failed (attempt %d)", ticker, attempt + 1, exc_info=True)
+                breaker.record_failure()
+                if attempt < self.retries:
+                    time.sleep(self.backoff * (2 ** attempt) * (1 + random.random()))
+                continue
+            breaker.record_success()
+            self.cache.put(ticker, quote)
+            return quote
+        return None
+
+    def _submit(self, ticker):
+        # Share one in-flight future per ticker across concurrent callers.
+        with self._lock:
+            future = self._inflight.get(ticker)
+            if future is None:
+                future = self._executor.submit(self._fetch_with_retry, ticker)
+                self._inflight[ticker] = future
+                future.add_done_callback(lambda _f, t=ticker: self._forget(t))
+            return future
+
+    def _forget(self, ticker):
+        with self._lock:
+            self._inflight.pop(ticker, None)
+
+    def quotes(self, tickers, refresh=False):
+        """Return ``{ticker: quote or None}``; tickers not done by the deadline map to ``None``.
+
+        ``refresh=True`` refetches every ticker, keeping the cached quote for any
+        ticker whose refetch fails.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        with TRACER.span("market_quotes") as span:
+            cached = {t: self.cache.get(t) for t in tickers}
+            result = dict.fromkeys(tickers) if refresh else dict(cached)
+            futures = {t: self._submit(t) for t, q in result.items() if q is None}
+            span["cache"] = "miss" if futures else "hit"
+            span["rows"] = len(tickers)
+            span["fetched"] = len(futures)
+            if futures:
+                wait(futures.values(), timeout=self.deadline)
+                for ticker, future in futures.items():
+                    result[ticker] = (future.result() if future.done() else None) or cached[ticker]
+            return result
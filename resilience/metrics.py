@@ -0,0 +1,67 @@
+"""Vectorized resilience metrics, valuation quadrants, asset tiers and selection filtering."""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+REGULATORY_MIN = 4.5
+
+QUADRANTS = {
+    (True, False): "Bargain",
+    (True, True): "Premium",
+    (False, True): "Trap",
+    (False, False): "Distressed",
+}
+
+# Asset-size tiers ($B), following the thresholds of the Fed's tailoring categories.
+ASSET_TIER_EDGES = [100.0, 250.0, 700.0]
+ASSET_TIERS = ["Under $100B", "$100B–250B", "$250B–700B", "$700B+"]
+
+METRIC_COLUMNS = [
+    "Actual_CET1", "Min_Stressed_CET1", "Total_Assets_B", "Stress_Delta", "Capital_Cushion",
+    "Layer_Regulatory_Min", "Layer_Stress_Burn", "Layer_True_Excess",
+]
+
+Valuation = namedtuple("Valuation", ["frame", "median_safety", "median_pb"])
+
+
+def compute_metrics(df, floor=REGULATORY_MIN):
+    """Return ``df`` with Stress Delta, Capital Cushion and the capital-stack layers."""
+    actual = df["Actual_CET1"].to_numpy(dtype=float)
+    stressed = df["Min_Stressed_CET1"].to_numpy(dtype=float)
+    burn = actual - stressed
+    cushion = stressed - floor
+    return df.assign(
+        Stress_Delta=burn,
+        Capital_Cushion=cushion,
+        Layer_Regulatory_Min=np.full(len(df), floor),
+        Layer_Stress_Burn=burn,
+        Layer_True_Excess=cushion,
+    )
+
+
+def asset_tier(total_assets_b):
+    """Categorical asset-size tier for each total-assets value ($B)."""
+    codes = np.searchsorted(ASSET_TIER_EDGES, np.asarray(total_assets_b, dtype=float), side="right")
+    return pd.Categorical.from_codes(codes, categories=ASSET_TIERS)
+
+
+def compact_metrics(df):
+    """The working-set layout: categorical ``Bank`` and ``Tier``, float32 metric columns."""
+    numeric = {c: "float32" for c in METRIC_COLUMNS if c in df.columns}
+    return df.astype({"Bank": "category", **numeric}).assign(Tier=asset_tier(df["Total_Assets_B"]))
+
+
+def classify_quadrants(df_val):
+    """Tag each bank with its Valuation Matrix quadrant, split at the medians."""
+    median_safety = df_val["Min_Stressed_CET1"].median()
+    median_pb = df_val["Price_to_Book"].median()
+    safe = (df_val["Min_Stressed_CET1"] >= median_safety).to_numpy()
+    expensive = (df_val["Price_to_Book"] >= median_pb).to_numpy()
+    labels = np.where(
+        safe,
+        np.where(expensive, QUADRANTS[(True, True)], QUADRANTS[(True, False)]),
+        np.where(expensive, QUADRANTS[(False, True)], QUADRANTS[(False, False)]),
+    )
+    frame = df_val.assign(Quadrant=pd.Categorical(labels, categories=list(QUADRANTS.values())))
+    return Valuation(frame, median_safety, median_pb)
@@ -0,0 +1,231 @@
+"""Rule-based counterparty limit monitoring with incremental evaluation.
+
+Rules are short expressions over metric columns:
+
+    Capital_Cushion > 2                 constant threshold ("%" is optional)
+    Stress_Delta < peer_median          relative to the cross-section (peer_mean, peer_p25, ...)
+    pct_change(P/B) <= -15              percent move against the value ``window`` ago (default a day)
+
+A ``limit`` rule fires while its condition is false ("keep the cushion above
+2%"); an ``alert`` rule fires while it is true ("P/B fell 15%"). Each update
+diffs the incoming values against the last ones and consults an inverted
+index from column to rules, so only rules whose inputs changed are evaluated:
+constant thresholds on just the banks that moved, peer-relative rules on the
+whole column. Transitions are kept as fired/cleared events in a bounded
+history, alongside one record per evaluation pass.
+"""
+import re
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+import pandas as pd
+
+COLUMN_ALIASES = {"P/B": "Price_to_Book", "PB": "Price_to_Book", "CET1": "Actual_CET1"}
+
+_OPS = {
+    "<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal,
+    "==": np.equal, "!=": np.not_equal,
+}
+_RULE = re.compile(
+    r"^\s*(?:pct_change\(\s*(?P<pct>[A-Za-z_/][\w/]*)\s*\)|(?P<col>[A-Za-z_/][\w/]*))"
+    r"\s*(?P<op><=|>=|==|!=|<|>)\s*"
+    r"(?P<rhs>peer_median|peer_mean|peer_p\d{1,2}|[-+]?\d+(?:\.\d+)?)\s*%?\s*$"
+)
+
+Event = namedtuple("Event", ["ts", "rule", "bank", "state", "value", "threshold"])
+Evaluation = namedtuple("Evaluation", ["ts", "changed_columns", "rules", "cells", "events"])
+
+
+class Rule(namedtuple("Rule", ["name", "expr", "fire_when", "banks", "column", "op", "rhs", "pct"])):
+    """A parsed rule; build with ``Rule.limit`` or ``Rule.alert``."""
+
+    __slots__ = ()
+
+    @classmethod
+    def parse(cls, name, expr, fire_when, banks=None):
+        match = _RULE.match(expr)
+        if match is None:
+            raise ValueError(f"cannot parse rule {name!r}: {expr!r}")
+        pct = match["pct"] is not None
+        column = match["pct"] if pct else match["col"]
+        rhs = match["rhs"]
+        rhs = rhs if rhs.startswith("peer_") else float(rhs)
+        banks = None if banks is None else frozenset(banks)
+        return cls(name, expr, fire_when, banks, COLUMN_ALIASES.get(column, column), match["op"], rhs, pct)
+
+    @classmethod
+    def limit(cls, name, expr, banks=None):
+        """Fires while ``expr`` does not hold."""
+        return cls.parse(name, expr, False, banks)
+
+    @classmethod
+    def alert(cls, name, expr, banks=None):
+        """Fires while ``expr`` holds."""
+        return cls.parse(name, expr, True, banks)
+
+    @property
+    def relative(self):
+        return isinstance(self.rhs, str)
+
+
+def parse_rules(text):
+    """Rules from ``kind name: expr`` lines (``kind`` is ``limit`` or ``alert``); ``#`` starts a comment."""
+    rules = []
+    for line in text.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        head, _, expr = line.partition(":")
+        kind, _, name = head.strip().partition(" ")
+        if kind not in ("limit", "alert") or not expr:
+            raise ValueError(f"expected 'limit|alert <name>: <expr>', got {line!r}")
+        rules.append(getattr(Rule, kind)(name.strip() or expr.strip(), expr.strip()))
+    return rules
+
+
+def _peer_stat(values, stat):
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return np.nan
+    if stat == "peer_median":
+        return float(np.median(values))
+    if stat == "peer_mean":
+        return float(values.mean())
+    return float(np.percentile(values, int(stat[len("peer_p"):])))
+
+
+class LimitMonitor:
+    """Evaluates ``rules`` against successive metric snapshots, re-checking only changed inputs."""
+
+    def __init__(self, rules, window=86400.0, max_history=10000):
+        self.rules = list(rules)
+        self.window = window
+        self.banks = np.array([], dtype=object)
+        self._pos = {}
+        self._values = {}
+        self._snapshots = {}  # column -> deque of (ts, values) for pct_change rules
+        self._baseline_ts = {}  # column -> ts of the snapshot pct_change last compared against
+        self._firing = [np.zeros(0, dtype=bool) for _ in self.rules]
+        self._scope = [None for _ in self.rules]
+        self._by_column = {}
+        for i, rule in enumerate(self.rules):
+            self._by_column.setdefault(rule.column, []).append(i)
+        self.events = deque(maxlen=max_history)
+        self.evaluations = deque(maxlen=max_history)
+
+    def _align(self, banks):
+        """Grow the bank axis with unseen banks; existing positions never move."""
+        new = [b for b in dict.fromkeys(banks) if b not in self._pos]
+        if not new:
+            return
+        start = len(self.banks)
+        self.banks = np.concatenate([self.banks, np.array(new, dtype=object)])
+        self._pos.update({b: start + k for k, b in enumerate(new)})
+        pad = np.full(len(new), np.nan)
+        self._values = {c: np.concatenate([v, pad]) for c, v in self._values.items()}
+        self._snapshots = {
+            c: deque(((ts, np.concatenate([v, pad])) for ts, v in snaps), maxlen=snaps.maxlen)
+            for c, snaps in self._snapshots.items()
+        }
+        self._firing = [np.concatenate([f, np.zeros(len(new), dtype=bool)]) for f in self._firing]
+        self._scope = [
+            None if rule.banks is None else np.isin(self.banks, list(rule.banks)) for rule in self.rules
+        ]
+
+    def _reference(self, column, ts):
+        """Values as of ``window`` ago for ``pct_change`` rules (oldest kept snapshot if younger)."""
+        snaps = self._snapshots[column]
+        ref = snaps[0]
+        for snap in snaps:
+            if snap[0] > ts - self.window:
+                break
+            ref = snap
+        return ref
+
+    def _record(self, column, ts):
+        snaps = self._snapshots.setdefault(column, deque(maxlen=4096))
+        snaps.append((ts, self._values[column].copy()))
+        while len(snaps) > 1 and snaps[1][0] <= ts - self.window:
+            snaps.popleft()
+
+    def update(self, frame, ts=None):
+        """Apply a snapshot (``Bank`` plus any metric columns); returns the new ``Event`` list.
+
+        Columns absent from ``frame`` and banks absent from it keep their previous values.
+        """
+        ts = time.time() if ts is None else ts
+        self._align(frame["Bank"])
+        rows = np.fromiter((self._pos[b] for b in frame["Bank"]), dtype=int, count=len(frame))
+        changed = {}
+        for column in self._by_column:
+            if column not in frame.columns:
+                continue
+            old = self._values.get(column, np.full(len(self.banks), np.nan))
+            new = old.copy()
+            new[rows] = pd.to_numeric(frame[column], errors="coerce").to_numpy(dtype=float)
+            diff = ~((new == old) | (np.isnan(new) & np.isnan(old)))
+            pct_rules = any(self.rules[i].pct for i in self._by_column[column])
+            if diff.any() or column not in self._values:
+                self._values[column] = new
+                changed[column] = diff
+            if pct_rules:
+                if column in changed or column not in self._snapshots:
+                    self._record(column, ts)
+                baseline_ts = self._reference(column, ts)[0]
+                if self._baseline_ts.setdefault(column, baseline_ts) != baseline_ts:
+                    self._baseline_ts[column] = baseline_ts
+                    changed[column] = np.ones(len(self.banks), dtype=bool)  # the baseline rolled
+        events, n_rules, n_cells = [], 0, 0
+        for column, diff in changed.items():
+            for i in self._by_column[column]:
+                cells = self._evaluate(i, column, diff, ts, events)
+                n_rules += cells > 0
+                n_cells += cells
+        self.events.extend(events)
+        self.evaluations.append(Evaluation(ts, tuple(changed), n_rules, n_cells, len(events)))
+        return events
+
+    def _evaluate(self, i, column, diff, ts, events):
+        rule = self.rules[i]
+        values = self._values[column]
+        if rule.pct:
+            ref = self._reference(column, ts)[1]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                values = (values / ref - 1.0) * 100.0
+        if rule.relative:
+            threshold = _peer_stat(self._values[column] if not rule.pct else values, rule.rhs)
+            mask = np.ones(len(self.banks), dtype=bool)
+        else:
+            threshold = rule.rhs
+            mask = diff
+        if self._scope[i] is not None:
+            mask = mask & self._scope[i]
+        idx = np.flatnonzero(mask)
+        if not len(idx):
+            return 0
+        subset = values[idx]
+        with np.errstate(invalid="ignore"):
+            holds = _OPS[rule.op](subset, threshold)
+        firing = np.where(np.isnan(subset), False, holds == rule.fire_when)
+        flipped = idx[firing != self._firing[i][idx]]
+        self._firing[i][idx] = firing
+        for j in flipped:
+            state = "fired" if self._firing[i][j] else "cleared"
+            events.append(Event(ts, rule.name, self.banks[j], state, float(values[j]), float(threshold)))
+        return len(idx)
+
+    def active(self):
+        """Currently firing (rule, bank) pairs with their latest value."""
+        rows = []
+        for rule, firing in zip(self.rules, self._firing):
+            for j in np.flatnonzero(firing):
+                rows.append({"Rule": rule.name, "Condition": rule.expr, "Bank": self.banks[j],
+                             "Value": self._values[rule.column][j]})
+        return pd.DataFrame(rows, columns=["Rule", "Condition", "Bank", "Value"])
+
+    def history(self):
+        """Fired/cleared events, oldest first."""
+        frame = pd.DataFrame(list(self.events), columns=Event._fields)
+        frame["ts"] = pd.to_datetime(frame["ts"], unit="s", utc=True)
+        return frame
@@ -0,0 +1,422 @@
+"""Locate and parse the DFAST results tables without text-extracting every page.
+
+The results PDF runs to 100+ pages, and pdfplumber's layout analysis is the
+expensive part. The locator builds a cheap keyword index first, from the PDF
+outline and PDFium's raw character stream, and only hands the candidate pages
+to ``extract_tables()``. Every table in ``TABLES`` is collected in that one
+pass: the index is built once, each candidate page is table-extracted at most
+once, and a table is taken from the first candidate page where it parses
+(plus its continuation pages), so a table the PDF repeats is read once. If
+PDFium cannot read the document, the fallback full scan is spread across a
+process pool. pdfplumber and PDFium are imported only when a parse actually
+runs.
+"""
+import io
+import logging
+import os
+import re
+from bisect import bisect_left
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+CET1_TITLE = "Projected minimum common equity tier 1 capital ratio"
+ASSETS_TITLE = "Total assets"
+LOSS_RATES_TITLE = "Projected loan loss rates"
+PPNR_TITLE = "Projected losses, revenue, and net income before taxes"
+SCENARIO = "Severely Adverse"
+
+# Bump when the parse output changes (columns, tables, cleaning); cached parses
+# written by another version are re-parsed even if the PDF itself is unchanged.
+PARSER_VERSION = 2
+
+# Used for banks the total-assets table does not cover, so bubbles still draw.
+ASSETS_PLACEHOLDER_B = 500.0
+
+# Loss-rate columns, matched against the normalized header text in order.
+LOSS_PORTFOLIOS = [
+    ("Loss_Total_Loans", "total loans"),
+    ("Loss_First_Lien_Mortgages", "first-lien"),
+    ("Loss_Junior_Liens", "junior"),
+    ("Loss_Commercial_Industrial", "commercial and industrial"),
+    ("Loss_Commercial_Real_Estate", "commercial real estate"),
+    ("Loss_Credit_Cards", "credit card"),
+    ("Loss_Other_Consumer", "other consumer"),
+    ("Loss_Other_Loans", "other loans"),
+]
+
+_WS = re.compile(r"\s+")
+
+
+def _norm(text):
+    return _WS.sub(" ", text or "").strip().lower()
+
+
+class PageIndex:
+    """Lazily built, lower-cased per-page text index backed by PDFium."""
+
+    def __init__(self, content):
+        import pypdfium2 as pdfium
+
+        self._doc = pdfium.PdfDocument(content)
+        self._text = {}
+
+    def __len__(self):
+        return len(self._doc)
+
+    def close(self):
+        self._doc.close()
+
+    def text(self, page_no):
+        if page_no not in self._text:
+            page = self._doc[page_no]
+            textpage = page.get_textpage()
+            try:
+                self._text[page_no] = _norm(textpage.get_text_bounded())
+            finally:
+                textpage.close()
+                page.close()
+        return self._text[page_no]
+
+    def outline_pages(self, phrase, span=3):
+        """Pages at, and just after, outline entries whose title contains ``phrase``."""
+        phrase = _norm(phrase)
+        pages = []
+        for bookmark in self._doc.get_toc():
+            if phrase not in _norm(bookmark.get_title()):
+                continue
+            dest = bookmark.get_dest()
+            index = dest.get_index() if dest is not None else None
+            if index is not None:
+                pages.extend(range(index, min(index + span, len(self))))
+        return list(dict.fromkeys(pages))
+
+    def find(self, *phrases, pages=None):
+        """Page numbers whose text contains every phrase, scanning ``pages`` or all."""
+        wanted = [_norm(p) for p in phrases]
+        candidates = range(len(self)) if pages is None else pages
+        return [n for n in candidates if all(w in self.text(n) for w in wanted)]
+
+    def locate(self, *phrases, outline_hint=None, near=(), radius=8):
+        """Pages containing ``phrases``, trying the cheapest candidates first.
+
+        Outline-hinted pages are checked first, then the pages within
+        ``radius`` of ``near`` (where related tables were found), and only
+        then is the whole text index scanned.
+        """
+        for pages in (
+            self.outline_pages(outline_hint or phrases[0]),
+            sorted({n for p in near for n in range(max(0, p - radius), min(p + radius + 1, len(self)))}),
+        ):
+            found = self.find(*phrases, pages=pages) if pages else []
+            if found:
+                return found
+        return self.find(*phrases)
+
+
+def locate_pages(content, *phrases, outline_hint=None):
+    """Return candidate page numbers for a table titled with ``phrases``.
+
+    The outline is consulted first; the text index is scanned only if the
+    outline has no matching entry. Returns ``None`` if PDFium is unavailable
+    or cannot open the document, so the caller knows to fall back to a full scan.
+    """
+    try:
+        index = PageIndex(content)
+    except Exception:
+        log.debug("PDFium cannot read the document", exc_info=True)
+        return None
+    try:
+        return index.locate(*phrases, outline_hint=outline_hint)
+    finally:
+        index.close()
+
+
+def _scan_chunk(args):
+    import pdfplumber
+
+    content, page_numbers, phrase_sets = args
+    wanted = [[_norm(p) for p in phrases] for phrases in phrase_sets]
+    hits = []
+    with pdfplumber.open(io.BytesIO(content)) as pdf:
+        for n in page_numbers:
+            text = _norm(pdf.pages[n].extract_text())
+            hits += [(n, i) for i, words in enumerate(wanted) if all(w in text for w in words)]
+    return hits
+
+
+def scan_pages_multi(content, phrase_sets, workers=None):
+    """Full pdfplumber text scan for several phrase sets at once.
+
+    Returns one sorted page list per phrase set. Pages are split across a
+    process pool and each page's text is extracted only once.
+    """
+    import pdfplumber
+
+    with pdfplumber.open(io.BytesIO(content)) as pdf:
+        n_pages = len(pdf.pages)
+    workers = max(1, min(workers or os.cpu_count() or 1, n_pages))
+    chunks = [list(range(i, n_pages, workers)) for i in range(workers)]
+    if workers == 1:
+        hits = _scan_chunk((content, chunks[0], phrase_sets))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = pool.map(_scan_chunk, [(content, chunk, phrase_sets) for chunk in chunks])
+            hits = [hit for part in parts for hit in part]
+    found = [[] for _ in phrase_sets]
+    for n, i in hits:
+        found[i].append(n)
+    return [sorted(pages) for pages in found]
+
+
+def _split_header(table, min_rows=10):
+    """Split a raw pdfplumber table into normalized column headers and body rows.
+
+    Header rows are the leading rows with no number in the second column;
+    their cells are joined per column. Returns ``None`` for small or narrow tables.
+    """
+    raw = pd.DataFrame(table).dropna(how="all")
+    if raw.shape[1] <= 2 or raw.shape[0] <= min_rows:
+        return None
+    numeric = pd.to_numeric(raw.iloc[:, 1].astype(str).str.replace(",", ""), errors="coerce").notna().to_numpy()
+    n_header = int(numeric.argmax()) if numeric.any() else len(raw)
+    header = raw.iloc[:n_header].fillna("").astype(str)
+    names = [_norm(" ".join(header.iloc[:, c])) for c in range(raw.shape[1])]
+    return names, raw.iloc[n_header:]
+
+
+def _numeric(column):
+    return pd.to_numeric(column.astype(str).str.replace(r"[,$]", "", regex=True), errors="coerce")
+
+
+def _bank_column(body):
+    banks = body.iloc[:, 0].astype(str).str.replace(r"\s+", " ", regex=True).str.strip()
+    return banks.where(banks.str.len() > 3)
+
+
+def _find_column(names, *keywords):
+    for c, name in enumerate(names):
+        if c and all(k in name for k in keywords):
+            return c
+    return None
+
+
+def _typed(frame, schema):
+    """``frame`` restricted and cast to ``schema``; an empty typed frame if ``None``."""
+    if frame is None:
+        frame = pd.DataFrame(columns=list(schema))
+    return frame.reindex(columns=list(schema)).astype(schema).reset_index(drop=True)
+
+
+def clean_cet1_table(table):
+    """Turn one raw pdfplumber table into the Bank / CET1 frame, or ``None``."""
+    raw = pd.DataFrame(table)
+    if raw.shape[1] <= 2 or raw.shape[0] <= 10:
+        return None
+    cleaned = pd.DataFrame()
+    raw = raw.dropna(how="all")
+    cleaned["Bank"] = raw.iloc[:, 0]
+    cleaned["Actual_CET1"] = pd.to_numeric(raw.iloc[:, 1], errors="coerce")
+    cleaned["Min_Stressed_CET1"] = pd.to_numeric(raw.iloc[:, -1], errors="coerce")
+    cleaned = cleaned.dropna()
+    cleaned = cleaned[cleaned["Bank"].str.len() > 3]
+    return cleaned if not cleaned.empty else None
+
+
+def clean_assets_table(table):
+    """Bank / Total_Assets_B from any bank-level table with a total-assets column."""
+    split = _split_header(table)
+    if split is None:
+        return None
+    names, body = split
+    col = _find_column(names, "total assets")
+    if col is None:
+        return None
+    cleaned = pd.DataFrame({"Bank": _bank_column(body), "Total_Assets_B": _numeric(body.iloc[:, col])}).dropna()
+    return cleaned if not cleaned.empty else None
+
+
+def clean_loss_rates_table(table):
+    """Bank plus one loss-rate column (percent of average balances) per loan portfolio."""
+    split = _split_header(table)
+    if split is None:
+        return None
+    names, body = split
+    cleaned = pd.DataFrame({"Bank": _bank_column(body)})
+    for column, keyword in LOSS_PORTFOLIOS:
+        col = _find_column(names, keyword)
+        if col is not None:
+            cleaned[column] = _numeric(body.iloc[:, col])
+    if cleaned.shape[1] < 3:
+        return None
+    cleaned = cleaned.dropna(subset=["Bank"]).dropna(how="all", subset=cleaned.columns[1:])
+    return cleaned if not cleaned.empty else None
+
+
+def clean_ppnr_table(table):
+    """Bank / PPNR_B / Net_Income_Before_Taxes_B (billions) from the revenue table."""
+    split = _split_header(table)
+    if split is None:
+        return None
+    names, body = split
+    ppnr = _find_column(names, "pre-provision net revenue")
+    if ppnr is None:
+        return None
+    cleaned = pd.DataFrame({"Bank": _bank_column(body), "PPNR_B": _numeric(body.iloc[:, ppnr])})
+    net = _find_column(names, "net income before taxes")
+    cleaned["Net_Income_Before_Taxes_B"] = _numeric(body.iloc[:, net]) if net is not None else float("nan")
+    cleaned = cleaned.dropna(subset=["Bank", "PPNR_B"])
+    return cleaned if not cleaned.empty else None
+
+
+TableSpec = namedtuple("TableSpec", ["phrases", "schema", "clean"])
+
+TABLES = {
+    "capital": TableSpec(
+        (CET1_TITLE, SCENARIO),
+        {"Bank": object, "Actual_CET1": "float64", "Min_Stressed_CET1": "float64"},
+        clean_cet1_table,
+    ),
+    "total_assets": TableSpec(
+        (ASSETS_TITLE, "billions of dollars"),
+        {"Bank": object, "Total_Assets_B": "float64"},
+        clean_assets_table,
+    ),
+    "loss_rates": TableSpec(
+        (LOSS_RATES_TITLE, SCENARIO),
+        {"Bank": object, **{column: "float64" for column, _ in LOSS_PORTFOLIOS}},
+        clean_loss_rates_table,
+    ),
+    "ppnr": TableSpec(
+        (PPNR_TITLE, SCENARIO),
+        {"Bank": object, "PPNR_B": "float64", "Net_Income_Before_Taxes_B": "float64"},
+        clean_ppnr_table,
+    ),
+}
+
+
+class StressTables(namedtuple("StressTables", list(TABLES))):
+    """One typed frame per ``TABLES`` entry; tables that were not found are empty."""
+
+    __slots__ = ()
+
+    @property
+    def stress(self):
+        """The capital table with total assets joined in, or ``None`` if it was not found."""
+        if self.capital.empty:
+            return None
+        assets = self.total_assets.drop_duplicates("Bank").set_index("Bank")["Total_Assets_B"]
+        frame = self.capital.copy()
+        frame["Total_Assets_B"] = frame["Bank"].map(assets).fillna(ASSETS_PLACEHOLDER_B).to_numpy()
+        return frame
+
+    def as_frames(self):
+        """``{"stress": ..., <table>: ...}``, the shape ``store.fetch_stress_table`` persists."""
+        return {"stress": self.stress, **self._asdict()}
+
+
+def _locate_all(content):
+    try:
+        index = PageIndex(content)
+    except Exception:
+        log.debug("PDFium cannot read the document; scanning every page", exc_info=True)
+        return scan_pages_multi(content, [spec.phrases for spec in TABLES.values()])
+    try:
+        located = []
+        for spec in TABLES.values():
+            # Results tables sit together, so a table without an outline entry is looked for next to the others.
+            located.append(index.locate(*spec.phrases, near=[p for pages in located for p in pages[:1]]))
+        return located
+    finally:
+        index.close()
+
+
+def _collect(spec, pages, tables_on):
+    """The cleaned table for ``spec`` from its candidate ``pages``.
+
+    The first page (in document order) holding a table that passes the spec's
+    cleaner wins, together with directly following candidate pages that pass
+    too, i.e. a table continued across pages. Later repeats of the same table
+    (the per-bank appendix repeating the summary) are never read.
+    """
+    parts, last = [], None
+    for page_no in pages:
+        if last is not None and page_no != last + 1:
+            break
+        cleaned = next((c for c in map(spec.clean, tables_on(page_no)) if c is not None), None)
+        if cleaned is not None:
+            parts.append(cleaned)
+            last = page_no
+        elif last is not None:
+            break
+    return pd.concat(parts, ignore_index=True).drop_duplicates("Bank") if parts else None
+
+
+def _page_tables(page):
+    """``page.extract_tables()``, with characters bucketed by row instead of re-filtered per row.
+
+    pdfplumber tests every character on the page against every row's bbox,
+    which is quadratic in the row count; sorting by vertical midpoint once
+    and bisecting gives the same cells in near-linear time.
+    """
+    from pdfplumber.utils import extract_text
+
+    chars = sorted(page.chars, key=lambda c: c["top"] + c["bottom"])
+    mids = [(c["top"] + c["bottom"]) / 2 for c in chars]
+    tables = []
+    for table in page.find_tables():
+        rows = []
+        for row in table.rows:
+            _, top, _, bottom = row.bbox
+            row_chars = chars[bisect_left(mids, top):bisect_left(mids, bottom)]
+            cells = []
+            for cell in row.cells:
+                if cell is None:
+                    cells.append(None)
+                    continue
+                x0, top, x1, bottom = cell
+                inside = [
+                    c for c in row_chars
+                    if x0 <= (c["x0"] + c["x1"]) / 2 < x1 and top <= (c["top"] + c["bottom"]) / 2 < bottom
+                ]
+                cells.append(extract_text(inside) if inside else "")
+            rows.append(cells)
+        tables.append(rows)
+    return tables
+
+
+def extract_tables(content):
+    """Collect every ``TABLES`` entry from the results PDF bytes in a single pass.
+
+    Each page is table-extracted at most once, however many specs list it,
+    and only until every spec has its table.
+    """
+    import pdfplumber
+
+    located = _locate_all(content)
+    frames = dict.fromkeys(TABLES)
+    if any(located):
+        with pdfplumber.open(io.BytesIO(content)) as pdf:
+            extracted = {}
+
+            def tables_on(page_no):
+                if page_no not in extracted:
+                    extracted[page_no] = _page_tables(pdf.pages[page_no])
+                return extracted[page_no]
+
+            for (name, spec), pages in zip(TABLES.items(), located):
+                frames[name] = _collect(spec, pages, tables_on)
+    return StressTables(**{name: _typed(frames[name], spec.schema) for name, spec in TABLES.items()})
+
+
+def parse_stress_tables(content):
+    """Every results table as ``{"stress": ..., <table>: ...}``; ``stress`` is ``None`` if absent."""
+    return extract_tables(content).as_frames()
+
+
+def parse_stress_pdf(content):
+    """The severely-adverse CET1 table, with total assets joined in, from the results PDF bytes."""
+    return extract_tables(content).stress
@@ -0,0 +1,176 @@
+"""Daily price histories and the market-risk overlay computed from them.
+
+Closes are cached per ticker as Parquet under ``<cache dir>/prices`` and only
+the days after the last stored date are fetched, so a daily refresh of the
+whole ``TICKER_MAP`` universe moves a few rows per ticker. Only settled
+sessions are stored: today's bar (exchange time) waits for the next refresh.
+The overlay reads the cache into one Date × Ticker matrix and computes every
+ticker's volatility, drawdown and correlation to its peers in a single
+vectorized pass.
+"""
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+from resilience.store import CACHE_DIR
+from resilience.telemetry import TRACER
+
+log = logging.getLogger(__name__)
+
+TRADING_DAYS = 252
+EXCHANGE_TZ = ZoneInfo("America/New_York")
+HISTORY_LOOKBACK_DAYS = 3 * 365
+OVERLAY_COLUMNS = ["Ticker", "Volatility_Ann", "Drawdown", "Max_Drawdown", "Peer_Corr", "Return_Window", "As_Of"]
+
+
+class PriceHistoryStore:
+    """One Parquet file of daily closes (``Date``, ``Close``) per ticker."""
+
+    def __init__(self, root=CACHE_DIR / "prices"):
+        self.root = Path(root)
+
+    def _path(self, ticker):
+        return self.root / f"{ticker.upper()}.parquet"
+
+    def tickers(self):
+        return sorted(p.stem for p in self.root.glob("*.parquet"))
+
+    def load(self, ticker):
+        path = self._path(ticker)
+        # Checked first so an empty cache never imports pyarrow.parquet just to fail.
+        if path.exists():
+            try:
+                return pd.read_parquet(path)
+            except (OSError, ValueError):
+                pass
+        return pd.DataFrame({"Date": pd.Series(dtype="datetime64[ns]"), "Close": pd.Series(dtype=float)})
+
+    def last_date(self, ticker):
+        frame = self.load(ticker)
+        return None if frame.empty else frame["Date"].max().date()
+
+    def append(self, ticker, closes):
+        """Merge a ``Date``-indexed close series into the ticker's file; returns rows added."""
+        if closes is None or closes.empty:
+            return 0
+        old = self.load(ticker)
+        new = pd.DataFrame({"Date": pd.to_datetime(closes.index).tz_localize(None).normalize(),
+                            "Close": closes.to_numpy(dtype=float)})
+        merged = pd.concat([old, new], ignore_index=True).drop_duplicates("Date", keep="last").sort_values("Date")
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(ticker)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        merged.reset_index(drop=True).to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+        return len(merged) - len(old)
+
+    def closes(self, tickers=None):
+        """Date × Ticker matrix of closes for ``tickers`` (default: everything stored)."""
+        tickers = self.tickers() if tickers is None else [t.upper() for t in tickers]
+        series = {t: self.load(t).set_index("Date")["Close"] for t in tickers}
+        series = {t: s for t, s in series.items() if not s.empty}
+        return pd.DataFrame(series).sort_index() if series else pd.DataFrame()
+
+    def version(self):
+        """Changes whenever any ticker's file is rewritten."""
+        stats = sorted((p.name, p.stat().st_mtime_ns, p.stat().st_size) for p in self.root.glob("*.parquet"))
+        return hashlib.sha256(repr(stats).encode()).hexdigest()[:16]
+
+
+def yahoo_history(ticker, start, session):
+    """Adjusted daily closes for ``ticker`` from ``start`` onwards."""
+    import yfinance as yf
+
+    history = yf.Ticker(ticker, session=session).history(start=start.isoformat(), auto_adjust=True)
+    return history.get("Close")
+
+
+def _settled(closes, today):
+    """``closes`` without the bars dated ``today`` or later, whose close may still move."""
+    if closes is None or closes.empty:
+        return closes
+    dates = pd.to_datetime(closes.index).tz_localize(None).normalize()
+    return closes[dates < pd.Timestamp(today)]
+
+
+def update_histories(tickers, store=None, fetch=yahoo_history, session_factory=None,
+                     lookback_days=HISTORY_LOOKBACK_DAYS, today=None, max_workers=8):
+    """Fetch only the missing settled days for each ticker and append them.
+
+    ``today`` defaults to the exchange's date; its session is never stored. The
+    fetch starts at the last stored date, so that bar is re-read and replaced.
+    Returns ``(added, errors)``: rows added per ticker and a ``{ticker: reason}`` map.
+    """
+    store = store or PriceHistoryStore()
+    today = today or datetime.now(EXCHANGE_TZ).date()
+    if session_factory is None:
+        from resilience.market import yahoo_session
+
+        session_factory = yahoo_session
+    session = session_factory()
+
+    last = {t: store.last_date(t) for t in dict.fromkeys(t.upper() for t in tickers)}
+    due = {
+        t: today - timedelta(days=lookback_days) if d is None else d
+        for t, d in last.items() if d is None or np.busday_count(d + timedelta(days=1), today) > 0
+    }
+    added, errors = {}, {}
+    with TRACER.span("price_history", rows=len(due)) as span:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(due) or 1))) as pool:
+            futures = {t: pool.submit(fetch, t, start, session) for t, start in due.items()}
+            for ticker, future in futures.items():
+                try:
+                    added[ticker] = store.append(ticker, _settled(future.result(), today))
+                except Exception as exc:
+                    log.warning("price history for %s failed", ticker, exc_info=True)
+                    errors[ticker] = f"{type(exc).__name__}: {exc}"
+        span["rows"] = sum(added.values())
+        span["cache"] = "hit" if not due else "miss"
+    return added, errors
+
+
+def risk_overlay(closes, window=TRADING_DAYS):
+    """Per-ticker market-risk metrics over the trailing ``window`` trading days, in one pass.
+
+    - ``Volatility_Ann``: annualized standard deviation of daily log returns (%)
+    - ``Drawdown``: latest close versus the window's peak (%)
+    - ``Max_Drawdown``: deepest peak-to-trough fall inside the window (%)
+    - ``Peer_Corr``: correlation of daily returns with the equal-weight average
+      of every other ticker
+    - ``Return_Window``: total price return over the window (%)
+    """
+    if closes.empty:
+        return pd.DataFrame(columns=OVERLAY_COLUMNS)
+    closes = closes.ffill().iloc[-(window + 1):]
+    prices = closes.to_numpy(dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = np.diff(np.log(prices), axis=0)
+        vol = np.nanstd(returns, axis=0, ddof=1) * np.sqrt(TRADING_DAYS) * 100
+        peak = np.fmax.accumulate(np.nan_to_num(prices, nan=-np.inf), axis=0)
+        drawdowns = prices / peak - 1.0
+        n = np.sum(~np.isnan(returns), axis=1, keepdims=True)
+        total = np.nansum(returns, axis=1, keepdims=True)
+        peers = (total - np.nan_to_num(returns)) / (n - ~np.isnan(returns))  # leave-one-out mean
+        x = returns - np.nanmean(returns, axis=0)
+        y = peers - np.nanmean(np.where(np.isnan(returns), np.nan, peers), axis=0)
+        valid = ~np.isnan(x) & ~np.isnan(y)
+        x, y = np.where(valid, x, 0.0), np.where(valid, y, 0.0)
+        corr = (x * y).sum(axis=0) / np.sqrt((x * x).sum(axis=0) * (y * y).sum(axis=0))
+        first = np.array([col[~np.isnan(col)][0] if (~np.isnan(col)).any() else np.nan for col in prices.T])
+        total_return = (prices[-1] / first - 1.0) * 100
+    return pd.DataFrame({
+        "Ticker": closes.columns,
+        "Volatility_Ann": vol,
+        "Drawdown": drawdowns[-1] * 100,
+        "Max_Drawdown": np.nanmin(drawdowns, axis=0) * 100,
+        "Peer_Corr": corr,
+        "Return_Window": total_return,
+        "As_Of": closes.index[-1],
+    })
@@ -0,0 +1,123 @@
+"""Stale-while-revalidate refresh of slow datasets on a background thread.
+
+Readers always get the last good snapshot immediately. A single daemon thread
+per process re-runs each dataset's loader ahead of its refresh interval, so
+no request ever blocks on a PDF download or a Yahoo sweep. A failed refresh
+keeps the previous snapshot and is retried after a backoff.
+"""
+import logging
+import threading
+import time
+from collections import namedtuple
+
+log = logging.getLogger(__name__)
+
+Snapshot = namedtuple("Snapshot", ["value", "as_of", "source", "error"])
+
+FRESH, STALE, FALLBACK, LOADING = "fresh", "stale", "fallback", "loading"
+
+
+class _Dataset:
+    def __init__(self, load, interval, source_of, snapshot):
+        self.load = load
+        self.interval = interval
+        self.source_of = source_of
+        self.snapshot = snapshot
+        self.next_run = 0.0
+        self.failures = 0
+
+
+class BackgroundRefresher:
+    """Keeps registered datasets warm; start once per server process."""
+
+    def __init__(self, refresh_ahead=0.8, retry_backoff=30.0, max_backoff=900.0):
+        self.refresh_ahead = refresh_ahead
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self._datasets = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def register(self, name, load, interval, initial=None, source_of=None):
+        """Add a dataset if it is not registered yet; its first load runs right away.
+
+        ``initial`` is an optional ``Snapshot`` to serve until that load finishes.
+        ``source_of`` maps a loaded value to a source label (e.g. ``"fallback"``).
+        """
+        with self._lock:
+            if name not in self._datasets:
+                self._datasets[name] = _Dataset(load, interval, source_of, initial)
+                self._wake.set()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="resilience-refresh", daemon=True)
+                self._thread.start()
+        return self
+
+    def get(self, name):
+        """The last good snapshot for ``name``, or ``None`` if nothing has loaded yet."""
+        with self._lock:
+            dataset = self._datasets.get(name)
+            return dataset.snapshot if dataset else None
+
+    def refresh_now(self, name):
+        with self._lock:
+            if name in self._datasets:
+                self._datasets[name].next_run = 0.0
+        self._wake.set()
+
+    def freshness(self, name, now=None):
+        """One of ``fresh``, ``stale``, ``fallback`` or ``loading``."""
+        with self._lock:
+            dataset = self._datasets.get(name)
+        snapshot = dataset.snapshot if dataset else None
+        if snapshot is None:
+            return LOADING
+        if snapshot.source == FALLBACK:
+            return FALLBACK
+        age = (now or time.time()) - snapshot.as_of
+        return FRESH if age < dataset.interval else STALE
+
+    def _due(self):
+        now = time.monotonic()
+        with self._lock:
+            return [(n, d) for n, d in self._datasets.items() if d.next_run <= now]
+
+    def _refresh(self, name, dataset):
+        try:
+            value = dataset.load()
+        except Exception as exc:
+            dataset.failures += 1
+            delay = min(self.retry_backoff * 2 ** (dataset.failures - 1), self.max_backoff)
+            log.warning("refreshing %s failed; retrying in %.0fs", name, delay, exc_info=True)
+            with self._lock:
+                if dataset.snapshot is not None:
+                    dataset.snapshot = dataset.snapshot._replace(error=repr(exc))
+                dataset.next_run = time.monotonic() + delay
+            return
+        source = dataset.source_of(value) if dataset.source_of else "live"
+        with self._lock:
+            if source == FALLBACK:
+                # The loader degraded to embedded data: keep any better snapshot and retry soon.
+                dataset.failures += 1
+                if dataset.snapshot is None or dataset.snapshot.source == FALLBACK:
+                    dataset.snapshot = Snapshot(value, time.time(), source, None)
+                delay = min(self.retry_backoff * 2 ** (dataset.failures - 1), self.max_backoff)
+                dataset.next_run = time.monotonic() + delay
+                return
+            dataset.failures = 0
+            dataset.snapshot = Snapshot(value, time.time(), source, None)
+            dataset.next_run = time.monotonic() + dataset.interval * self.refresh_ahead
+
+    def _run(self):
+        while True:
+            self._wake.clear()
+            for name, dataset in self._due():
+                self._refresh(name, dataset)
+            with self._lock:
+                pending = [d.next_run for d in self._datasets.values()]
+            timeout = max(min(pending) - time.monotonic(), 0.0) if pending else None
+            self._wake.wait(timeout)
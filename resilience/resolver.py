@@ -0,0 +1,117 @@
+"""Bank-name → ticker resolution.
+
+Names coming out of the DFAST PDF vary ("JPMorgan Chase & Co.", "The Goldman
+Sachs Group, Inc.", footnote markers such as "Citigroup Inc.1"). The resolver
+normalizes a whole column with vectorized string ops, maps exact aliases in one
+``Series.map`` and falls back to a token trie (longest known prefix) for the
+remaining distinct names. Trie results are memoized, so a rerun over the same
+universe is a pair of dictionary lookups per row.
+"""
+from collections import namedtuple
+
+import pandas as pd
+
+# Extra spellings seen in Fed and market data, keyed by ticker.
+DEFAULT_ALIASES = {
+    "JPM": ["jp morgan chase", "jpmorgan"],
+    "BAC": ["bofa"],
+    "C": ["citi", "citigroup global markets"],
+    "GS": ["goldman"],
+    "COF": ["capital one financial"],
+    "USB": ["us bank", "u s bancorp"],
+    "PNC": ["pnc financial services"],
+    "TFC": ["truist financial", "bb and t"],
+    "SCHW": ["schwab"],
+    "BK": ["bank of new york mellon", "bny"],
+}
+
+_FOOTNOTES = r"[\*†‡§¹²³⁰-⁹]+|(?<=[a-z\.\)])\d+$"
+_LEGAL_SUFFIX = (
+    r"(?:\s+(?:and\s+)?(?:inc|incorporated|corp|corporation|co|company|llc|plc|ltd|na|n a"
+    r"|holdings?|group|the))+$"
+)
+
+Resolution = namedtuple("Resolution", ["tickers", "canonical", "unmatched"])
+
+
+def normalize_names(names):
+    """Vectorized canonical form of a sequence of bank names (a ``Series``)."""
+    s = pd.Series(names, dtype="object").fillna("").astype(str)
+    s = s.str.normalize("NFKC").str.strip().str.lower()
+    s = s.str.replace(_FOOTNOTES, "", regex=True)
+    s = s.str.replace("&", " and ", regex=False)
+    s = s.str.replace(r"\b([a-z])\.(?=[a-z]\.)", r"\1", regex=True)  # "u.s." -> "us."
+    s = s.str.replace(r"[^a-z0-9 ]+", " ", regex=True)
+    s = s.str.replace(r"\s+", " ", regex=True).str.strip()
+    s = s.str.replace(r"^the\s+", "", regex=True)
+    return s.str.replace(_LEGAL_SUFFIX, "", regex=True).str.strip()
+
+
+class _TokenTrie:
+    """Token-level trie answering longest-known-prefix queries."""
+
+    _END = object()
+
+    def __init__(self):
+        self._root = {}
+
+    def add(self, key, value):
+        node = self._root
+        for token in key.split():
+            node = node.setdefault(token, {})
+        node[self._END] = value
+
+    def longest_prefix(self, key):
+        node, best = self._root, None
+        for token in key.split():
+            node = node.get(token)
+            if node is None:
+                break
+            best = node.get(self._END, best)
+        return best
+
+
+class TickerResolver:
+    """Resolve bank names to tickers; build once and reuse across reruns."""
+
+    def __init__(self, ticker_map, aliases=DEFAULT_ALIASES):
+        canonical_by_ticker = {}
+        self._exact = {}
+        self._trie = _TokenTrie()
+        for name, ticker in ticker_map.items():
+            canonical_by_ticker.setdefault(ticker, name)
+        entries = [(name, ticker) for name, ticker in ticker_map.items()]
+        entries += [(alias, t) for t, names in aliases.items() if t in canonical_by_ticker for alias in names]
+        keys = normalize_names([name for name, _ in entries])
+        for key, (_, ticker) in zip(keys, entries):
+            hit = (ticker, canonical_by_ticker[ticker])
+            self._exact.setdefault(key, hit)
+            self._trie.add(key, hit)
+        self._memo = {}
+
+    def _lookup(self, key):
+        if key not in self._memo:
+            self._memo[key] = self._exact.get(key) or self._trie.longest_prefix(key)
+        return self._memo[key]
+
+    def resolve(self, names):
+        """Resolve a column of names in one pass.
+
+        Returns ``Resolution(tickers, canonical, unmatched)`` where the first two
+        are Series aligned with ``names`` (``NaN`` where unresolved) and
+        ``unmatched`` lists the distinct original names with no ticker.
+        """
+        names = pd.Series(names, dtype="object")
+        keys = normalize_names(names)
+        keys.index = names.index
+        hits = {key: self._lookup(key) for key in keys.unique()}
+        matched = keys.map(hits)
+        tickers = matched.map(lambda h: h[0] if h else None)
+        canonical = matched.map(lambda h: h[1] if h else None)
+        unmatched = names[tickers.isna()].drop_duplicates().tolist()
+        return Resolution(tickers, canonical, unmatched)
+
+    def ticker(self, name):
+        """Ticker for a single name, or ``None``."""
+        hit = self._lookup(normalize_names([name]).iloc[0])
+        return hit[0] if hit else None
@@ -0,0 +1,189 @@
+"""Cross-process cache shared by every dashboard replica on a host.
+
+``st.cache_data`` is per process, so replicas behind a load balancer would each
+download the Fed PDF and sweep Yahoo on their own. Datasets instead go through
+a small key-value store (a directory of pickles by default, or one SQLite
+file) and ``single_flight``, which takes a per-key inter-process lock so only
+one replica refreshes a dataset while the others wait and then reuse its
+result.
+"""
+import logging
+import os
+import pickle
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import quote
+
+from resilience.store import CACHE_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+Entry = namedtuple("Entry", ["value", "stored_at"])
+
+log = logging.getLogger(__name__)
+
+
+@contextmanager
+def file_lock(path, timeout=None, poll=0.1):
+    """Exclusive advisory lock on ``path``; yields ``False`` if ``timeout`` ran out.
+
+    The OS drops the lock if the holder dies, so a crashed replica cannot
+    wedge the others.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    acquired = False
+    try:
+        while not acquired:
+            try:
+                if fcntl:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                acquired = True
+            except OSError:
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                time.sleep(poll)
+        yield acquired
+    finally:
+        if acquired:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        os.close(fd)
+
+
+class KeyValueStore(ABC):
+    """Interface for shared stores: ``get``/``put`` pickled values and a per-key ``lock``.
+
+    ``get`` treats an entry that cannot be unpickled (truncated, or written by
+    an older code layout) as missing and drops it, so the next refresh
+    overwrites it instead of failing on it forever.
+    """
+
+    @abstractmethod
+    def get(self, key):
+        """Return an ``Entry`` for ``key`` or ``None``."""
+
+    @abstractmethod
+    def put(self, key, value):
+        """Store ``value`` for ``key``."""
+
+    @abstractmethod
+    def lock(self, key, timeout=None):
+        """Context manager holding the inter-process lock for ``key``."""
+
+
+class FileKVStore(KeyValueStore):
+    """One pickle file per key, written atomically; the default backend."""
+
+    def __init__(self, root=CACHE_DIR / "shared"):
+        self.root = Path(root)
+
+    def _path(self, key, suffix):
+        return self.root / (quote(key, safe="") + suffix)
+
+    def get(self, key):
+        path = self._path(key, ".pkl")
+        try:
+            with open(path, "rb") as fh:
+                return pickle.load(fh)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            log.warning("dropping unreadable shared entry %s", key, exc_info=True)
+            path.unlink(missing_ok=True)
+            return None
+
+    def put(self, key, value):
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(key, ".pkl")
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as fh:
+            pickle.dump(Entry(value, time.time()), fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def lock(self, key, timeout=None):
+        return file_lock(self._path(key, ".lock"), timeout)
+
+
+class SQLiteKVStore(KeyValueStore):
+    """All keys in one SQLite file (WAL mode); locks are sidecar lock files."""
+
+    def __init__(self, path=CACHE_DIR / "shared.sqlite3"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value BLOB, stored_at REAL)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key):
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, stored_at FROM kv WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        try:
+            return Entry(pickle.loads(row[0]), row[1])
+        except Exception:
+            log.warning("dropping unreadable shared entry %s", key, exc_info=True)
+            with self._connect() as conn:
+                conn.execute("DELETE FROM kv WHERE key = ?", (key,))
+            return None
+
+    def put(self, key, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO kv VALUES (?, ?, ?)", (key, blob, time.time()))
+
+    def lock(self, key, timeout=None):
+        return file_lock(self.path.with_name(f"{self.path.name}.{quote(key, safe='')}.lock"), timeout)
+
+
+def open_store(spec=None):
+    """Build a store from ``spec`` or ``$RESILIENCE_SHARED_STORE``.
+
+    ``sqlite:///path/to/file.sqlite3`` selects SQLite; any other value is a
+    directory for the file store; empty means the file store in the cache dir.
+    """
+    spec = spec if spec is not None else os.environ.get("RESILIENCE_SHARED_STORE", "")
+    if spec.startswith("sqlite:///"):
+        return SQLiteKVStore(spec[len("sqlite:///"):])
+    return FileKVStore(spec) if spec else FileKVStore()
+
+
+def single_flight(store, key, compute, max_age, accept=None, lock_timeout=300.0):
+    """Return a value for ``key`` no older than ``max_age`` seconds, computing it at most once per host.
+
+    Only results for which ``accept(value)`` is true are shared. If the lock is
+    not acquired within ``lock_timeout`` the stale entry is served if there is
+    one, otherwise the value is computed locally.
+    """
+    entry = store.get(key)
+    if entry is not None and time.time() - entry.stored_at < max_age:
+        return entry.value
+    with store.lock(key, timeout=lock_timeout) as acquired:
+        if acquired:
+            # Another replica may have refreshed while we waited for the lock.
+            entry = store.get(key)
+            if entry is not None and time.time() - entry.stored_at < max_age:
+                return entry.value
+        elif entry is not None:
+            return entry.value
+        value = compute()
+        if acquired and (accept is None or accept(value)):
+            store.put(key, value)
+        return value
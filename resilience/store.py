@@ -0,0 +1,185 @@
+"""Persistent on-disk cache for the parsed DFAST stress table.
+
+Parsed frames are written as Parquet, keyed by the PDF URL, the SHA-256 of
+the PDF bytes they were parsed from and the parser version that produced them.
+Any supplementary tables from the same parse are stored beside the main frame
+under the same key. A small JSON sidecar per URL remembers the
+ETag / Last-Modified validators so a refresh can be a conditional GET: an
+unchanged PDF costs one round-trip and no pdfplumber work.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from resilience.telemetry import TRACER
+
+log = logging.getLogger(__name__)
+
+CACHE_DIR = Path(os.environ.get("RESILIENCE_CACHE_DIR", Path.home() / ".cache" / "resilience"))
+
+
+def _url_key(url):
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+
+
+def _atomic_write_bytes(path, data):
+    tmp = path.with_suffix(path.suffix + f".{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+class StressTableStore:
+    """Parquet store for parsed stress tables, one entry per (URL, content hash, parser version)."""
+
+    def __init__(self, root=CACHE_DIR):
+        self.root = Path(root)
+
+    def _meta_path(self, url):
+        return self.root / f"{_url_key(url)}.json"
+
+    def _frame_path(self, url, content_hash, table=None, version=None):
+        suffix = (f"-v{version}" if version is not None else "") + (f"-{table}" if table else "")
+        return self.root / f"{_url_key(url)}-{content_hash[:16]}{suffix}.parquet"
+
+    def meta(self, url):
+        """Return the stored metadata for ``url`` or an empty dict."""
+        try:
+            return json.loads(self._meta_path(url).read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def load(self, url, version=None):
+        """Return ``(frame, meta)`` for the last good parse of ``url``, or ``(None, meta)``.
+
+        With ``version``, a parse written by any other parser version counts as missing.
+        """
+        meta = self.meta(url)
+        content_hash = meta.get("content_sha256")
+        if not content_hash or (version is not None and meta.get("parser_version") != version):
+            return None, meta
+        try:
+            return pd.read_parquet(self._frame_path(url, content_hash, version=meta.get("parser_version"))), meta
+        except (OSError, ValueError):
+            return None, meta
+
+    def load_tables(self, url):
+        """Supplementary tables from the last good parse of ``url`` as ``{name: frame}``."""
+        meta = self.meta(url)
+        content_hash = meta.get("content_sha256")
+        tables = {}
+        for name in meta.get("tables", []) if content_hash else []:
+            try:
+                tables[name] = pd.read_parquet(self._frame_path(url, content_hash, name, meta.get("parser_version")))
+            except (OSError, ValueError):
+                continue
+        return tables
+
+    def save(self, url, frame, content_hash, etag=None, last_modified=None, tables=None, version=None):
+        """Persist ``frame`` (and ``tables``) for ``url``; drop frames from older PDF or parser versions."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        tables = tables or {}
+        paths = set()
+        for name, table in [(None, frame), *tables.items()]:
+            path = self._frame_path(url, content_hash, name, version)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            table.reset_index(drop=True).to_parquet(tmp, index=False)
+            os.replace(tmp, path)
+            paths.add(path)
+        meta = {
+            "url": url,
+            "content_sha256": content_hash,
+            "parser_version": version,
+            "etag": etag,
+            "last_modified": last_modified,
+            "checked_at": time.time(),
+            "tables": sorted(tables),
+        }
+        self._write_meta(url, meta)
+        for old in self.root.glob(f"{_url_key(url)}-*.parquet"):
+            if old not in paths:
+                old.unlink(missing_ok=True)
+        return meta
+
+    def touch(self, url, etag=None, last_modified=None):
+        """Record a successful revalidation without rewriting the frame."""
+        meta = self.meta(url)
+        if etag:
+            meta["etag"] = etag
+        if last_modified:
+            meta["last_modified"] = last_modified
+        meta["checked_at"] = time.time()
+        self._write_meta(url, meta)
+        return meta
+
+    def _write_meta(self, url, meta):
+        self.root.mkdir(parents=True, exist_ok=True)
+        _atomic_write_bytes(self._meta_path(url), json.dumps(meta, indent=2).encode("utf-8"))
+
+
+def fetch_stress_table(url, parse, store=None, timeout=15, session=None, version=None):
+    """Return the parsed table for ``url``, revalidating the cached copy first.
+
+    ``parse`` turns the PDF bytes into a frame (or ``None`` if nothing usable was
+    found), or into ``{"stress": frame, <table>: frame, ...}`` when it collects
+    supplementary tables too; those are stored with the frame. The cached frame is returned on a 304, when the downloaded bytes hash
+    to the cached version, and whenever the network or the parser fails.
+    A cached parse from a parser ``version`` other than the current one is only
+    kept as that fallback: the PDF is downloaded unconditionally and re-parsed.
+    Returns ``None`` only when there is neither a fresh parse nor a cached one.
+    """
+    import requests
+
+    store = store or StressTableStore()
+    cached, meta = store.load(url)
+    current = cached is not None and meta.get("parser_version") == version
+
+    headers = {}
+    if current:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    with TRACER.span("pdf_download") as span:
+        try:
+            resp = (session or requests).get(url, headers=headers, timeout=timeout)
+        except requests.RequestException as exc:
+            span["error"] = type(exc).__name__
+            return cached
+        span["bytes"] = len(resp.content)
+        span["status"] = resp.status_code
+        span["cache"] = "hit" if resp.status_code == 304 else "miss"
+
+    etag = resp.headers.get("ETag")
+    last_modified = resp.headers.get("Last-Modified")
+    if resp.status_code == 304 and current:
+        store.touch(url, etag, last_modified)
+        return cached
+    if resp.status_code != 200:
+        return cached
+
+    content_hash = hashlib.sha256(resp.content).hexdigest()
+    if current and content_hash == meta.get("content_sha256"):
+        store.touch(url, etag, last_modified)
+        return cached
+
+    with TRACER.span("pdf_parse") as span:
+        try:
+            parsed = parse(resp.content)
+        except Exception as exc:
+            log.warning("parsing %s failed; keeping the cached table", url, exc_info=True)
+            span["error"] = type(exc).__name__
+            parsed = None
+        tables = dict(parsed) if isinstance(parsed, dict) else {}
+        frame = tables.pop("stress", None) if isinstance(parsed, dict) else parsed
+        span["rows"] = 0 if frame is None else len(frame)
+        span["tables"] = sum(not t.empty for t in tables.values())
+    if frame is None or frame.empty:
+        return cached
+    store.save(url, frame, content_hash, etag, last_modified, tables, version)
+    return frame
@@ -0,0 +1,220 @@
+"""Streaming price updates for the valuation matrix.
+
+A ``PriceStream`` runs a pluggable asyncio price source on a daemon thread and
+records, per ticker, the latest price and the sequence number of its last
+change. Readers hold a ``LiveValuation`` and ask only for what changed since
+the sequence number they last saw, so each poll reprices just the moved
+tickers. Book value is fixed intraday, so P/B moves with the price:
+``pb = pb_ref * price / price_ref``, where ``pb_ref`` is the P/B the
+valuation was built with and ``price_ref`` the stream's price when the
+``LiveValuation`` was created (or its first tick after that), so moves the
+valuation already reflects are not applied twice.
+
+Sources implement ``async def stream(tickers)`` that yields lists of
+``PriceTick``: ``SimulatedFeed`` for local testing, and ``YahooPriceSource``,
+which polls last prices over the shared Yahoo session.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from resilience.metrics import QUADRANTS
+
+log = logging.getLogger(__name__)
+
+PriceTick = namedtuple("PriceTick", ["ticker", "price", "ts"])
+LiveUpdate = namedtuple("LiveUpdate", ["rows", "quadrant_rows", "median_pb", "seq"])
+
+
+class SimulatedFeed:
+    """Random-walk prices with occasional headline jumps, for offline use.
+
+    Each ``interval`` a fraction ``move_prob`` of tickers moves by a normal
+    return with volatility ``vol``; with probability ``headline_prob`` one
+    ticker also gaps by ``±headline_move``.
+    """
+
+    def __init__(self, interval=1.0, vol=0.002, move_prob=0.3, headline_prob=0.05, headline_move=0.08,
+                 start_price=100.0, seed=0):
+        self.interval = interval
+        self.vol = vol
+        self.move_prob = move_prob
+        self.headline_prob = headline_prob
+        self.headline_move = headline_move
+        self.start_price = start_price
+        self.seed = seed
+
+    async def stream(self, tickers):
+        rng = np.random.default_rng(self.seed)
+        prices = np.full(len(tickers), self.start_price)
+        yield [PriceTick(t, p, time.time()) for t, p in zip(tickers, prices)]
+        while True:
+            await asyncio.sleep(self.interval)
+            moved = rng.random(len(tickers)) < self.move_prob
+            prices[moved] *= np.exp(rng.normal(0.0, self.vol, int(moved.sum())))
+            if len(tickers) and rng.random() < self.headline_prob:
+                i = int(rng.integers(len(tickers)))
+                prices[i] *= 1 + self.headline_move * rng.choice([-1.0, 1.0])
+                moved[i] = True
+            now = time.time()
+            yield [PriceTick(tickers[i], float(prices[i]), now) for i in np.flatnonzero(moved)]
+
+
+class YahooPriceSource:
+    """Polls last prices every ``interval`` seconds; only changed prices are emitted."""
+
+    def __init__(self, interval=15.0, session_factory=None):
+        self.interval = interval
+        self.session_factory = session_factory
+
+    def _fetch(self, tickers, session):
+        import yfinance as yf
+
+        prices = {}
+        for ticker in tickers:
+            try:
+                prices[ticker] = float(yf.Ticker(ticker, session=session).fast_info["lastPrice"])
+            except Exception:
+                log.debug("no last price for %s", ticker, exc_info=True)
+                continue
+        return prices
+
+    async def stream(self, tickers):
+        if self.session_factory is None:
+            from resilience.market import yahoo_session
+
+            self.session_factory = yahoo_session
+        session = self.session_factory()
+        last = {}
+        while True:
+            prices = await asyncio.to_thread(self._fetch, tickers, session)
+            now = time.time()
+            changed = [PriceTick(t, p, now) for t, p in prices.items() if last.get(t) != p]
+            last.update(prices)
+            if changed:
+                yield changed
+            await asyncio.sleep(self.interval)
+
+
+class PriceStream:
+    """Latest price per ticker from ``source``, consumed on its own event-loop thread."""
+
+    def __init__(self, source, tickers):
+        self.source = source
+        self.tickers = list(dict.fromkeys(tickers))
+        self._index = {t: i for i, t in enumerate(self.tickers)}
+        self._price = np.full(len(self.tickers), np.nan)
+        self._changed_at = np.zeros(len(self.tickers), dtype=np.int64)
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._loop = None
+        self._task = None
+        self._thread = None
+        self.error = None
+
+    def start(self):
+        if self._thread is None:
+            self._loop = asyncio.new_event_loop()
+            self._task = self._loop.create_task(self._consume())
+            self._thread = threading.Thread(target=self._run, name="resilience-prices", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._task is not None:
+            self._loop.call_soon_threadsafe(self._task.cancel)
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+
+    async def _consume(self):
+        try:
+            async for batch in self.source.stream(self.tickers):
+                self.apply(batch)
+        except Exception as exc:
+            log.warning("price stream stopped", exc_info=True)
+            self.error = repr(exc)
+
+    def apply(self, ticks):
+        """Record a batch of ticks; unchanged prices do not advance the ticker's sequence."""
+        with self._lock:
+            for tick in ticks:
+                i = self._index.get(tick.ticker)
+                if i is None or not tick.price > 0 or tick.price == self._price[i]:
+                    continue
+                self._seq += 1
+                self._price[i] = tick.price
+                self._changed_at[i] = self._seq
+
+    def changes(self, since=0):
+        """``(seq, tickers, prices)`` for tickers changed after ``since``; ``since=0`` is every priced ticker."""
+        with self._lock:
+            idx = np.flatnonzero(self._changed_at > since)
+            return self._seq, [self.tickers[i] for i in idx], self._price[idx].copy()
+
+
+class LiveValuation:
+    """Per-reader P/B and quadrants for a ``metrics.Valuation``, updated from a ``PriceStream``.
+
+    The stream's prices at construction are the reference for this
+    valuation's P/B; only moves after that are applied.
+    """
+
+    def __init__(self, valuation, stream):
+        frame = valuation.frame
+        self.tickers = frame["Ticker"].to_numpy(dtype=object)
+        self._row = {t: i for i, t in enumerate(self.tickers)}
+        self.base_pb = frame["Price_to_Book"].to_numpy(dtype=float)
+        self.pb = self.base_pb.copy()
+        self.safe = (frame["Min_Stressed_CET1"] >= valuation.median_safety).to_numpy()
+        self.median_pb = valuation.median_pb
+        self.quadrant = frame["Quadrant"].astype(str).to_numpy(dtype=object)
+        self.ref_price = np.full(len(self.tickers), np.nan)
+        self.seen, tickers, prices = stream.changes(0)
+        for ticker, price in zip(tickers, prices):
+            if ticker in self._row:
+                self.ref_price[self._row[ticker]] = price
+
+    def _quadrants(self):
+        expensive = self.pb >= self.median_pb
+        return np.where(
+            self.safe,
+            np.where(expensive, QUADRANTS[(True, True)], QUADRANTS[(True, False)]),
+            np.where(expensive, QUADRANTS[(False, True)], QUADRANTS[(False, False)]),
+        ).astype(object)
+
+    def apply(self, stream):
+        """Reprice the tickers that moved since the last call; returns a ``LiveUpdate``."""
+        seq, tickers, prices = stream.changes(self.seen)
+        self.seen = seq
+        pairs = [(self._row[t], p) for t, p in zip(tickers, prices) if t in self._row]
+        rows = np.array([r for r, _ in pairs], dtype=int)
+        if not len(rows):
+            return LiveUpdate(rows, rows, self.median_pb, seq)
+        price = np.array([p for _, p in pairs])
+        fresh = np.isnan(self.ref_price[rows])
+        self.ref_price[rows[fresh]] = price[fresh]
+        self.pb[rows] = self.base_pb[rows] * price / self.ref_price[rows]
+        self.median_pb = float(np.median(self.pb))
+        quadrant = self._quadrants()
+        quadrant_rows = np.flatnonzero(quadrant != self.quadrant)
+        self.quadrant = quadrant
+        return LiveUpdate(rows, quadrant_rows, self.median_pb, seq)
+
+    def frame(self, valuation):
+        """``valuation.frame`` with the live P/B and quadrants."""
+        return valuation.frame.assign(
+            Price_to_Book=self.pb,
+            Quadrant=pd.Categorical(self.quadrant, categories=list(QUADRANTS.values())),
+        )
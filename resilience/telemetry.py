@@ -0,0 +1,137 @@
+"""Per-stage timing instrumentation.
+
+Code paths wrap their work in ``TRACER.span(stage)`` and annotate the span with
+cache hit/miss, bytes downloaded and rows processed. Records are kept in a
+bounded in-memory ring (and optionally appended to a JSON-lines log named by
+``$RESILIENCE_TRACE_LOG``) and can be summarized as latency percentiles or
+dumped in the Prometheus text exposition format. The ring only feeds the
+percentiles; Prometheus counts, sums and counters come from per-stage totals
+that never shrink, so they stay monotonic after the ring wraps.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class Tracer:
+    """Thread-safe recorder of stage timings."""
+
+    def __init__(self, maxlen=10_000, log_path=None):
+        self._records = deque(maxlen=maxlen)
+        self._totals = {}
+        self._lock = threading.Lock()
+        self.log_path = log_path
+
+    @contextmanager
+    def span(self, stage, **attrs):
+        """Time the enclosed block; set ``cache``, ``bytes`` or ``rows`` on the yielded dict."""
+        record = {"stage": stage, "cache": None, "bytes": None, "rows": None, **attrs}
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception as exc:
+            record["error"] = type(exc).__name__
+            raise
+        finally:
+            record["ts"] = time.time()
+            record["duration_s"] = time.perf_counter() - start
+            self._add(record)
+
+    def _add(self, record):
+        with self._lock:
+            self._records.append(record)
+            totals = self._totals.setdefault(
+                record["stage"], {"count": 0, "seconds": 0.0, "bytes": 0, "rows": 0, "hit": 0, "miss": 0},
+            )
+            totals["count"] += 1
+            totals["seconds"] += record["duration_s"]
+            for key in ("bytes", "rows"):
+                if record.get(key) is not None:
+                    totals[key] += record[key]
+            if record.get("cache") in ("hit", "miss"):
+                totals[record["cache"]] += 1
+            if self.log_path:
+                with open(self.log_path, "a") as fh:
+                    fh.write(json.dumps(record, default=str) + "\n")
+
+    def records(self):
+        with self._lock:
+            return list(self._records)
+
+    def totals(self):
+        """Cumulative ``{stage: {count, seconds, bytes, rows, hit, miss}}`` since start (or ``clear()``)."""
+        with self._lock:
+            return {stage: dict(t) for stage, t in self._totals.items()}
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+            self._totals.clear()
+
+    def summary(self):
+        """One row per stage: call count, latency percentiles (ms), cache hit ratio, bytes and rows."""
+        records = self.records()
+        if not records:
+            return pd.DataFrame(columns=["stage", "calls", "p50_ms", "p90_ms", "p99_ms", "last_ms",
+                                         "hit_ratio", "bytes", "rows"])
+        df = pd.DataFrame(records)
+        rows = []
+        for stage, group in df.groupby("stage", sort=True):
+            ms = group["duration_s"].to_numpy() * 1000
+            p50, p90, p99 = np.percentile(ms, [q * 100 for q in QUANTILES])
+            cache = group["cache"].dropna()
+            rows.append({
+                "stage": stage, "calls": len(group),
+                "p50_ms": p50, "p90_ms": p90, "p99_ms": p99, "last_ms": ms[-1],
+                "hit_ratio": (cache == "hit").mean() if len(cache) else np.nan,
+                "bytes": group["bytes"].dropna().sum(), "rows": group["rows"].dropna().sum(),
+            })
+        return pd.DataFrame(rows)
+
+    def to_prometheus(self, prefix="resilience"):
+        """Prometheus text exposition: a latency summary plus cache, bytes and rows counters.
+
+        Quantiles cover the records still in the ring; ``_sum``, ``_count`` and
+        the ``_total`` counters are cumulative.
+        """
+        with self._lock:
+            records = list(self._records)
+            totals = {stage: dict(t) for stage, t in self._totals.items()}
+        durations = {}
+        for r in records:
+            durations.setdefault(r["stage"], []).append(r["duration_s"])
+        lines = [
+            f"# HELP {prefix}_stage_seconds Wall time per dashboard stage.",
+            f"# TYPE {prefix}_stage_seconds summary",
+        ]
+        for stage, t in sorted(totals.items()):
+            if stage in durations:
+                for q, v in zip(QUANTILES, np.quantile(durations[stage], QUANTILES)):
+                    lines.append(f'{prefix}_stage_seconds{{stage="{stage}",quantile="{q}"}} {v:.6f}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {t["seconds"]:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {t["count"]}')
+        for name, help_text in (("bytes", "Bytes downloaded per stage."), ("rows", "Rows processed per stage.")):
+            lines += [f"# HELP {prefix}_stage_{name}_total {help_text}", f"# TYPE {prefix}_stage_{name}_total counter"]
+            for stage, t in sorted(totals.items()):
+                lines.append(f'{prefix}_stage_{name}_total{{stage="{stage}"}} {t[name]}')
+        lines += [f"# HELP {prefix}_stage_cache_total Cache lookups per stage and result.",
+                  f"# TYPE {prefix}_stage_cache_total counter"]
+        for stage, t in sorted(totals.items()):
+            for result in ("hit", "miss"):
+                if t[result]:
+                    lines.append(f'{prefix}_stage_cache_total{{stage="{stage}",result="{result}"}} {t[result]}')
+        return "\n".join(lines) + "\n"
+
+    def to_jsonl(self):
+        return "".join(json.dumps(r, default=str) + "\n" for r in self.records())
+
+
+TRACER = Tracer(log_path=os.environ.get("RESILIENCE_TRACE_LOG") or None)
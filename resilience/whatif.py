@@ -0,0 +1,57 @@
+"""Precomputed what-if grid over the regulatory floor and a stress-loss multiplier.
+
+Under a multiplier ``m`` the projected burn scales, so
+``stressed = actual - m * (actual - fed_stressed)``, and the cushion over a
+floor ``f`` is ``stressed - f``. Both are computed once per data version for
+every grid point: a banks × multipliers matrix of stressed CET1 and a
+banks × floors × multipliers tensor of cushions. Picking a scenario is then a
+nearest-index lookup, and any view of it is the unchanged columns plus a
+slice of these arrays; nothing is recomputed. Tensors are float32, like the
+engine's working set.
+"""
+import numpy as np
+
+from resilience.metrics import REGULATORY_MIN
+
+DEFAULT_FLOORS = np.round(np.arange(REGULATORY_MIN, 10.0 + 1e-9, 0.25), 2)
+DEFAULT_MULTIPLIERS = np.round(np.arange(0.5, 3.0 + 1e-9, 0.1), 2)
+
+
+class WhatIfGrid:
+    """Stressed CET1 and cushions for every (floor, multiplier) grid point."""
+
+    def __init__(self, metrics, floors=DEFAULT_FLOORS, multipliers=DEFAULT_MULTIPLIERS):
+        self.base = metrics
+        self.floors = np.asarray(floors, dtype=float)
+        self.multipliers = np.asarray(multipliers, dtype=float)
+        actual = metrics["Actual_CET1"].to_numpy(dtype=np.float32)
+        burn = actual - metrics["Min_Stressed_CET1"].to_numpy(dtype=np.float32)
+        floors = self.floors.astype(np.float32)
+        self.burn = burn[:, None] * self.multipliers.astype(np.float32)[None, :]  # banks × M
+        self.stressed = actual[:, None] - self.burn                                # banks × M
+        self.cushion = self.stressed[:, None, :] - floors[None, :, None]           # banks × F × M
+
+    @property
+    def shape(self):
+        return self.cushion.shape
+
+    def index(self, floor, multiplier):
+        """Nearest grid indices ``(i_floor, i_multiplier)``."""
+        return (int(np.abs(self.floors - floor).argmin()),
+                int(np.abs(self.multipliers - multiplier).argmin()))
+
+    def columns(self, i, j, rows=slice(None)):
+        """The scenario-dependent metric columns at grid point ``(i, j)``, for ``rows`` only."""
+        burn, cushion = self.burn[rows, j], self.cushion[rows, i, j]
+        return {
+            "Min_Stressed_CET1": self.stressed[rows, j],
+            "Stress_Delta": burn,
+            "Capital_Cushion": cushion,
+            "Layer_Regulatory_Min": np.full(len(burn), self.floors[i], dtype=np.float32),
+            "Layer_Stress_Burn": burn,
+            "Layer_True_Excess": cushion,
+        }
+
+    def metrics(self, floor, multiplier):
+        """The metrics frame for the nearest grid point, with the same columns as ``compute_metrics``."""
+        return self.base.assign(**self.columns(*self.index(floor, multiplier)))